@@ -0,0 +1,71 @@
+"""Concurrent-request latency for the async endpoints.
+
+Keeps ``--concurrency`` requests in flight against the async list endpoints
+of a running server and, at the same time, probes a cheap route that does
+not touch the database. When the async handlers block the event loop the
+probe latency climbs with the load; when queries are offloaded it stays
+flat. Run it against the old and the new build and compare the output:
+
+    PRUVE_DB_URI=postgresql://... uvicorn pruve:app --port 8000
+    python benchmarks/bench_async_endpoints.py --base-url http://127.0.0.1:8000
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_common import get, timings
+
+LOAD_ROUTES = ["/pruve/conversations", "/pruve/wildcards", "/pruve/matchschedule", "/pruve/data"]
+PROBE_ROUTE = "/pruve/docs"
+
+
+def summarize(samples):
+    return dict({"requests": len(samples)}, **timings(samples, (50, 95, 99), with_max=True))
+
+
+def timed_get(url):
+    return get(url)[1]
+
+
+def run(base_url, concurrency, duration):
+    deadline = time.monotonic() + duration
+    load = {route: [] for route in LOAD_ROUTES}
+    probe = []
+    lock = threading.Lock()
+
+    def load_worker(i):
+        route = LOAD_ROUTES[i % len(LOAD_ROUTES)]
+        while time.monotonic() < deadline:
+            elapsed = timed_get(base_url + route)
+            with lock:
+                load[route].append(elapsed)
+
+    def probe_worker():
+        while time.monotonic() < deadline:
+            probe.append(timed_get(base_url + PROBE_ROUTE))
+            time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=concurrency + 1) as executor:
+        futures = [executor.submit(load_worker, i) for i in range(concurrency)]
+        futures.append(executor.submit(probe_worker))
+        for future in futures:
+            future.result()
+
+    report = {route: summarize(samples) for route, samples in load.items()}
+    report[PROBE_ROUTE + " (probe)"] = summarize(probe)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    args = parser.parse_args()
+    print(json.dumps(run(args.base_url.rstrip("/"), args.concurrency, args.duration), indent=2))
+
+
+if __name__ == "__main__":
+    main()
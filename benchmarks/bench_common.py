@@ -0,0 +1,59 @@
+"""Timing and HTTP helpers shared by the benchmark scripts."""
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))]
+
+
+def timings(samples, pcts=(50, 99), with_max=False, digits=2):
+    """``{"p50_ms": ..., "p99_ms": ...}`` for latencies given in seconds."""
+    result = {"p%d_ms" % pct: round(percentile(samples, pct) * 1000, digits) for pct in pcts}
+    if with_max:
+        result["max_ms"] = round(max(samples) * 1000, digits) if samples else 0.0
+    return result
+
+
+def request(url, payload=None, method=None, check=True):
+    """Send ``payload`` as JSON, or GET without one; returns ``(status, seconds, body)``.
+
+    With ``check`` a non-2xx answer raises RuntimeError, otherwise its
+    status is returned like any other.
+    """
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method=method)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        body = error.read()
+        status = error.code
+    elapsed = time.perf_counter() - start
+    if check and not 200 <= status < 300:
+        raise RuntimeError("%s %s returned %d: %s" % (method or "GET", url, status, body[:200].decode(errors="replace")))
+    return status, elapsed, body
+
+
+def get(url, check=True):
+    return request(url, check=check)
+
+
+def post(url, payload, check=True):
+    return request(url, payload, "POST", check)
+
+
+def timed(items, concurrency, send):
+    """Call ``send`` on every item from ``concurrency`` threads; returns ``(seconds, results)``."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, items))
+    return time.perf_counter() - start, results
@@ -0,0 +1,62 @@
+"""Time league creation and bulk member adds at several league sizes.
+
+Posts to /pruve/leagues with 10, 1k and 10k members (uids 1..N, which
+should exist in users_pruve) and, where the server has it, adds the same
+users to an empty league through /pruve/leagues/{league_id}/members:
+
+    PRUVE_DB_URI=postgresql://... uvicorn pruve:app --port 8000
+    python benchmarks/bench_create_league.py --base-url http://127.0.0.1:8000
+"""
+import argparse
+import json
+import statistics
+
+from bench_common import post
+
+
+def league_payload(size, label):
+    return {
+        "name": "bench %s %d" % (label, size),
+        "creator_id": 1,
+        "users": list(range(1, size + 1)),
+        "description": "benchmark league",
+        "matchup_id": list(range(1, 71)),
+        "is_public": False,
+    }
+
+
+def run(base_url, sizes, repeat):
+    results = []
+    for size in sizes:
+        create_times, add_times = [], []
+        for _ in range(repeat):
+            _, elapsed, _ = post(base_url + "/pruve/leagues", league_payload(size, "create"))
+            create_times.append(elapsed)
+
+            _, _, body = post(base_url + "/pruve/leagues", league_payload(0, "members"))
+            body = json.loads(body)
+            if "league_id" not in body:
+                continue  # server predates the bulk members endpoint
+            status, elapsed, _ = post(base_url + "/pruve/leagues/%d/members" % body["league_id"],
+                                      {"users": list(range(1, size + 1))}, check=False)
+            if 200 <= status < 300:
+                add_times.append(elapsed)
+        results.append({
+            "members": size,
+            "create_league_ms": round(statistics.median(create_times) * 1000, 1),
+            "add_members_ms": round(statistics.median(add_times) * 1000, 1) if add_times else None,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.base_url.rstrip("/"), args.sizes, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
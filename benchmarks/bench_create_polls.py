@@ -0,0 +1,68 @@
+"""Poll creation throughput, one poll per request vs. the bulk endpoint.
+
+Creates ``--polls`` wildcard polls through /pruve/create_polls from
+``--concurrency`` threads, then the same number again through
+/pruve/polls/bulk in batches of ``--batch-size``. Polls are created by user
+``--user-id``, which must exist. Against a server without the bulk endpoint
+only the first half runs:
+
+    PRUVE_DB_URI=postgresql://... uvicorn pruve:app --port 8000
+    python benchmarks/bench_create_polls.py --polls 2000 --batch-size 200
+"""
+import argparse
+import json
+
+from bench_common import percentile, post, timed
+
+
+def poll_payload(user_id, i):
+    return {
+        "user_id": user_id,
+        "question": "bench poll %d: who wins the toss?" % i,
+        "options": [{"option_text": "CSK"}, {"option_text": "MI"}, {"option_text": "No result"}],
+        "answer": "MI",
+    }
+
+
+def run(base_url, user_id, polls, concurrency, batch_size):
+    payloads = [poll_payload(user_id, i) for i in range(polls)]
+    elapsed, latencies = timed(payloads, concurrency,
+                               lambda payload: post(base_url + "/pruve/create_polls", payload)[1])
+    results = {"polls": polls, "single": {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "polls_per_s": round(polls / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }}
+
+    batches = [{"polls": payloads[i:i + batch_size]} for i in range(0, polls, batch_size)]
+    # An empty batch creates nothing; it only shows whether the endpoint exists
+    status, _, _ = post(base_url + "/pruve/polls/bulk", {"polls": []}, check=False)
+    if status in (404, 405):
+        results["bulk"] = None  # server predates the bulk endpoint
+    else:
+        elapsed, latencies = timed(batches, 1, lambda batch: post(base_url + "/pruve/polls/bulk", batch)[1])
+        results["bulk"] = {
+            "batch_size": batch_size,
+            "seconds": round(elapsed, 2),
+            "polls_per_s": round(polls / elapsed, 1),
+            "batch_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--polls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.base_url.rstrip("/"), args.user_id, args.polls, args.concurrency, args.batch_size),
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Rows per second serialized by the list endpoints, model path vs. fast path.
+
+Mounts two routes per row type on a throwaway FastAPI app, both declaring
+the same ``response_model``: one returns a pydantic model per row (what the
+endpoints used to do, so FastAPI validates and encodes every row), the
+other returns the rows as dicts in a ``FastJSONResponse``. Requests go
+straight to the ASGI app, without a client or socket in the way. Rows are
+synthetic, shaped like the database tuples, so no database is needed:
+
+    python benchmarks/bench_serialization.py --rows 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi import FastAPI  # noqa: E402
+
+from pruve import (ConversationModel, FastJSONResponse, Matchschedule, conversation_from_row,  # noqa: E402
+                   matchschedule_from_row, orjson)
+
+
+def conversation_rows(count):
+    start = datetime(2024, 4, 1, 19, 30)
+    return [(i, "conversation", {"uid": i % 97, "name": "User %d" % (i % 97), "picture": "https://example.com/p.png"},
+             start + timedelta(minutes=i), [{"nickName": "CSK"}, {"nickName": "MI"}], "CSK by 20 runs", i % 40,
+             [{"emoji": "fire", "count": i % 13}], "https://example.com/c/%d" % i) for i in range(count)]
+
+
+def matchschedule_rows(count):
+    start = datetime(2024, 4, 1, 19, 30)
+    return [(i, "Chennai Super Kings", "Mumbai Indians", start + timedelta(days=i), i * 3, i * 2, "Wankhede",
+             "https://example.com/csk.png", "https://example.com/mi.png", "matchschedule") for i in range(count)]
+
+
+CASES = {
+    "conversations": (ConversationModel, conversation_rows, conversation_from_row),
+    "matchschedule": (Matchschedule, matchschedule_rows, matchschedule_from_row),
+}
+
+
+def make_endpoints(model, rows, from_row):
+    # Closures rather than default arguments: FastAPI would treat those as
+    # query parameters and deep-copy them on every request
+    def models():
+        return [model(**from_row(row)) for row in rows]
+
+    def fast():
+        return FastJSONResponse([from_row(row) for row in rows])
+
+    return models, fast
+
+
+def build_app(rows_by_case):
+    app = FastAPI()
+    for name, (model, _, from_row) in CASES.items():
+        models, fast = make_endpoints(model, rows_by_case[name], from_row)
+        app.add_api_route("/%s/models" % name, models, response_model=List[model])
+        app.add_api_route("/%s/fast" % name, fast, response_model=List[model])
+    return app
+
+
+async def get(app, path):
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+             "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    status = sent[0]["status"]
+    if status != 200:
+        raise RuntimeError("GET %s returned %d" % (path, status))
+    return b"".join(message.get("body", b"") for message in sent[1:])
+
+
+async def rows_per_second(app, path, rows, repeat):
+    await get(app, path)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await get(app, path)
+    return round(rows * repeat / (time.perf_counter() - start))
+
+
+async def run(rows, repeat):
+    rows_by_case = {name: make_rows(rows) for name, (_, make_rows, _) in CASES.items()}
+    app = build_app(rows_by_case)
+    results = {"rows": rows, "encoder": "orjson" if orjson is not None else "json"}
+    for name in CASES:
+        before = await rows_per_second(app, "/%s/models" % name, rows, repeat)
+        after = await rows_per_second(app, "/%s/fast" % name, rows, repeat)
+        results[name] = {"models_rows_per_s": before, "fast_rows_per_s": after, "speedup": round(after / before, 1)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
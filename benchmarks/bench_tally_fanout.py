@@ -0,0 +1,97 @@
+"""Fan-out cost of live tally updates with many subscribers on one topic.
+
+Subscribes ``--subscribers`` consumers to one match through ``TallyHub``,
+publishes votes at ``--rate`` per second for ``--duration`` seconds, and
+reports how long each coalesced flush takes, how late the last subscriber
+receives it, and whether anyone was dropped. Runs in-process, no database
+or HTTP involved:
+
+    python benchmarks/bench_tally_fanout.py --subscribers 10000 --rate 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_common import timings  # noqa: E402
+from pruve import TallyHub  # noqa: E402
+
+TOPIC = "match:1"
+
+
+async def run(subscribers, rate, duration, interval):
+    loop = asyncio.get_running_loop()
+    hub = TallyHub(interval=interval)
+    hub.bind(loop)
+
+    flush_started = {}  # seq -> loop time the flush began
+    flush_times = []
+    original_flush = hub._flush
+
+    def timed_flush(topic):
+        start = loop.time()
+        flush_started[hub._sequence[topic] + 1] = start
+        original_flush(topic)
+        flush_times.append(loop.time() - start)
+
+    hub._flush = timed_flush
+
+    last_delivery = {}  # seq -> loop time the last subscriber got it
+    votes_seen = [0]
+
+    async def consumer():
+        queue = hub.subscribe(TOPIC)
+        while True:
+            message = await queue.get()
+            if message is TallyHub.RESYNC:
+                return
+            event = json.loads(message.split("data: ", 1)[1])
+            last_delivery[event["seq"]] = loop.time()
+            votes_seen[0] += event["total_delta"]
+
+    consumers = [loop.create_task(consumer()) for _ in range(subscribers)]
+    await asyncio.sleep(0)
+
+    rng = random.Random(1)
+    published = 0
+    start = loop.time()
+    while loop.time() - start < duration:
+        batch = max(1, rate // 100)
+        for _ in range(batch):
+            hub.publish(TOPIC, rng.choice((1, 2)))
+        published += batch
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(interval * 4)
+
+    for task in consumers:
+        task.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+
+    lag = [last_delivery[seq] - flush_started[seq] for seq in last_delivery if seq in flush_started]
+    return {
+        "subscribers": subscribers,
+        "votes_published": published,
+        "events_per_subscriber": len(flush_times),
+        "votes_delivered_per_subscriber": round(votes_seen[0] / subscribers, 1),
+        "flush": timings(flush_times, with_max=True),
+        "delivery_to_last_subscriber": timings(lag, with_max=True),
+        "dropped_subscribers": hub.stats()["dropped_subscribers"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--rate", type=int, default=2000, help="votes per second")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds")
+    parser.add_argument("--interval", type=float, default=0.25, help="coalescing interval in seconds")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.subscribers, args.rate, args.duration, args.interval)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Latency of /pruve/users/search/ matching, full scan vs. the trigram index.
+
+Builds synthetic user tables at each scale, then times the old per-request
+scan (``fuzz.ratio`` against every row) and ``UserSearchIndex.search`` on
+the same misspelled queries, and reports how often the index finds a match
+as good as the scan's best. No database is needed:
+
+    python benchmarks/bench_user_search.py --scales 10000 100000 1000000
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from rapidfuzz import fuzz  # noqa: E402
+
+from bench_common import timings  # noqa: E402
+from pruve import UserSearchIndex  # noqa: E402
+
+ONSETS = ["", "b", "ch", "d", "f", "g", "h", "j", "k", "l", "m", "n", "p", "r", "s", "sh", "t", "v", "w", "y", "z",
+          "br", "kr", "pr", "st", "th"]
+VOWELS = ["a", "e", "i", "o", "u", "aa", "ee", "ai", "ou", "ia"]
+CODAS = ["", "", "n", "r", "l", "m", "s", "sh", "th", "k", "nd", "rt"]
+
+
+def make_word(rng):
+    return "".join(rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS) for _ in range(rng.randint(2, 3)))
+
+
+def make_name_generator(seed, first_names=5000, last_names=20000):
+    """Names drawn Zipf-style from pronounceable first/last name vocabularies."""
+    rng = random.Random(seed)
+    firsts = sorted({make_word(rng) for _ in range(first_names)})
+    lasts = sorted({make_word(rng) for _ in range(last_names)})
+    rng.shuffle(firsts)
+    rng.shuffle(lasts)
+    first_weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(len(firsts))))
+    last_weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(len(lasts))))
+
+    def make_name(rng):
+        first = rng.choices(firsts, cum_weights=first_weights)[0]
+        last = rng.choices(lasts, cum_weights=last_weights)[0]
+        return (first + " " + last).title()
+
+    return make_name
+
+
+def misspell(rng, name):
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    if rng.random() < 0.5:
+        del chars[i]
+    else:
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def full_scan(users, query):
+    # What search_users did before the index: score every row in Python
+    matches = []
+    for uid, name, picture in users:
+        score = fuzz.ratio(query, name)
+        if score > 50:
+            matches.append((score, name))
+    matches.sort(reverse=True)
+    return matches[:5]
+
+
+def run_scale(size, queries, scan_queries, seed):
+    rng = random.Random(seed)
+    make_name = make_name_generator(seed)
+    users = [(uid, make_name(rng), "https://example.com/%d.png" % uid) for uid in range(1, size + 1)]
+
+    index = UserSearchIndex()
+    start = time.perf_counter()
+    for uid, name, picture in users:
+        index.add(uid, name, picture)
+    build_seconds = time.perf_counter() - start
+
+    probes = [misspell(rng, users[rng.randrange(size)][1]) for _ in range(queries)]
+
+    index_times, index_results = [], []
+    for query in probes:
+        start = time.perf_counter()
+        index_results.append(index.search(query))
+        index_times.append(time.perf_counter() - start)
+
+    # Many users share a name, so compare scores rather than uids: a query
+    # counts as a hit when the index's best match scores as high as the scan's.
+    scan_times, hits = [], 0
+    for query, from_index in zip(probes[:scan_queries], index_results):
+        start = time.perf_counter()
+        from_scan = full_scan(users, query)
+        scan_times.append(time.perf_counter() - start)
+        best_scan = from_scan[0][0] if from_scan else None
+        best_index = fuzz.ratio(query, from_index[0]["user_name"]) if from_index else None
+        hits += best_scan == best_index
+
+    return {
+        "users": size,
+        "index_build_s": round(build_seconds, 2),
+        "index": timings(index_times, digits=3),
+        "full_scan": timings(scan_times, digits=3),
+        "top1_hit_rate": round(hits / min(scan_queries, queries), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--scan-queries", type=int, default=20, help="full scans are slow; time fewer of them")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    results = [run_scale(size, args.queries, args.scan_queries, args.seed) for size in args.scales]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Vote throughput with many users voting on one poll at once.
+
+Every voter casts one vote on ``--poll-id`` (spread over ``--option-ids``)
+and then repeats it, so the run also shows duplicates being turned away
+with 409s rather than slipping through. Users ``--first-user`` onwards
+must exist and must not have voted on the poll yet:
+
+    PRUVE_DB_URI=postgresql://... uvicorn pruve:app --port 8000 --workers 4
+    python benchmarks/bench_vote.py --poll-id 12 --option-ids 31 32 --voters 1000
+"""
+import argparse
+import collections
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_common import percentile, post
+
+
+def post_vote(url, user_id, option_id):
+    status, elapsed, _ = post(url, {"user_id": user_id, "option_id": option_id}, check=False)
+    return status, elapsed
+
+
+def run(base_url, poll_id, option_ids, voters, first_user, concurrency):
+    url = "%s/pruve/polls/%d/vote" % (base_url, poll_id)
+    statuses = collections.Counter()
+    latencies = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(concurrency)
+
+    def voter(i):
+        if i < concurrency:
+            start_gate.wait()  # release the first wave together so they really contend
+        user_id = first_user + i
+        option_id = option_ids[i % len(option_ids)]
+        for _ in range(2):
+            status, elapsed = post_vote(url, user_id, option_id)
+            with lock:
+                statuses[status] += 1
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(voter, range(voters)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "voters": voters,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 2),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "votes_per_s": round(statuses[200] / elapsed, 1),
+        "status_counts": dict(sorted(statuses.items())),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--poll-id", type=int, required=True)
+    parser.add_argument("--option-ids", type=int, nargs="+", required=True)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--first-user", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    args = parser.parse_args()
+    concurrency = min(args.concurrency, args.voters)
+    print(json.dumps(run(args.base_url.rstrip("/"), args.poll_id, args.option_ids, args.voters,
+                         args.first_user, concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
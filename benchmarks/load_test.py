@@ -0,0 +1,344 @@
+"""Drive every pruve route concurrently and report throughput and latency percentiles.
+
+Each route is hit ``--requests`` times (``--heavy-requests`` for bulk and
+export routes) from ``--concurrency`` threads, one route at a time, after a
+few untimed warm-up requests. Request parameters are drawn from the same
+scale the database was seeded with (see seed_data.py), from a fixed seed.
+Results are written as JSON to ``--output``. Pass an earlier results file
+as ``--compare`` to print the change per route:
+
+    python benchmarks/seed_data.py --dsn postgresql://... --scale small --reset
+    PRUVE_DB_URI=postgresql://... uvicorn pruve:app --port 8000
+    python benchmarks/load_test.py --scale small --output before.json
+    python benchmarks/load_test.py --scale small --output after.json --compare before.json
+
+Any answer outside 2xx that a route does not expect (see
+EXPECTED_STATUSES) is counted as unexpected; when a route's unexpected
+rate is over ``--max-unexpected-rate`` the routes are listed and the
+script exits with status 1, after writing the results.
+
+Write routes change the data they run against; reseed before comparing
+runs. ``--read-only`` skips them. The admin routes send ``--admin-key``
+(PRUVE_ADMIN_KEY by default) and are skipped without one. The server-sent
+event routes are not driven here, see bench_tally_fanout.py.
+"""
+import argparse
+import collections
+import http.client
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from bench_common import timings
+from seed_data import FIRST_NAMES, TEAMS, add_scale_arguments, scale_from_args
+
+
+def poll_payload(user_id, question):
+    return {"user_id": user_id, "question": question, "answer": "MI",
+            "options": [{"option_text": "CSK"}, {"option_text": "MI"}, {"option_text": "No result"}]}
+
+
+def random_user(rng, scale):
+    return rng.randint(1, scale["users"])
+
+
+def random_poll(rng, scale):
+    return rng.randint(1, scale["polls"])
+
+
+# name -> (method, build(rng, scale, run) -> (path, body), heavy); ``run``
+# holds a per-run tag and counter so created rows never collide
+ROUTES = collections.OrderedDict([
+    ("pool_stats", ("GET", lambda rng, scale, run: ("/pruve/pool/stats", None), False)),
+    ("cache_stats", ("GET", lambda rng, scale, run: ("/pruve/cache/stats", None), False)),
+    ("live_stats", ("GET", lambda rng, scale, run: ("/pruve/live/stats", None), False)),
+    ("users_search", ("GET", lambda rng, scale, run: (
+        "/pruve/users/search/?user_name=" + rng.choice(FIRST_NAMES)[:rng.randint(3, 6)], None), False)),
+    ("leagues", ("GET", lambda rng, scale, run: ("/pruve/leagues/%d" % random_user(rng, scale), None), False)),
+    ("leagues_not_member", ("GET", lambda rng, scale, run: (
+        "/pruve/leagues/not_member/%d" % random_user(rng, scale), None), False)),
+    ("conversations", ("GET", lambda rng, scale, run: ("/pruve/conversations", None), False)),
+    ("wildcards", ("GET", lambda rng, scale, run: ("/pruve/wildcards", None), False)),
+    ("matchschedule", ("GET", lambda rng, scale, run: ("/pruve/matchschedule", None), False)),
+    ("feed", ("GET", lambda rng, scale, run: ("/pruve/data?limit=20", None), False)),
+    ("matchcards", ("GET", lambda rng, scale, run: ("/pruve/%d/matchcards/" % random_user(rng, scale), None), False)),
+    ("user_polls_legacy", ("GET", lambda rng, scale, run: ("/user/%d/polls" % random_user(rng, scale), None), False)),
+    ("poll_feed", ("GET", lambda rng, scale, run: ("/pruve/user/%d/polls" % random_user(rng, scale), None), False)),
+    ("poll_voters", ("GET", lambda rng, scale, run: ("/pruve/polls/%d/voters" % random_poll(rng, scale), None),
+                     False)),
+    ("poll_results", ("GET", lambda rng, scale, run: (
+        "/pruve/polls/%d" % rng.randint(1, scale["legacy_polls"]), None), False)),
+    ("polls_all", ("GET", lambda rng, scale, run: ("/pruve/polls", None), False)),
+    ("comments_page", ("GET", lambda rng, scale, run: (
+        "/pruve/comments/%d" % rng.randint(1, scale["matches"]), None), False)),
+    ("comments_export", ("GET", lambda rng, scale, run: ("/pruve/comments/?format=ndjson", None), True)),
+    ("login", ("POST", lambda rng, scale, run: ("/pruve/user", dict(
+        zip(("email", "name", "picture"), existing_user(random_user(rng, scale))))), False)),
+    ("create_poll", ("POST", lambda rng, scale, run: (
+        "/pruve/create_polls", poll_payload(random_user(rng, scale), "load %s %d?" % (run["tag"], next(run["ids"])))),
+        False)),
+    ("create_polls_bulk", ("POST", lambda rng, scale, run: ("/pruve/polls/bulk", {"polls": [
+        poll_payload(random_user(rng, scale), "bulk %s %d?" % (run["tag"], next(run["ids"]))) for _ in range(100)]}),
+        True)),
+    ("vote", ("POST", lambda rng, scale, run: vote_request(rng, scale), False)),
+    ("match_vote_and_comment", ("POST", lambda rng, scale, run: match_vote_request(rng, scale), False)),
+    ("create_league", ("POST", lambda rng, scale, run: ("/pruve/leagues", {
+        "name": "load %s %d" % (run["tag"], next(run["ids"])), "creator_id": random_user(rng, scale),
+        "users": rng.sample(range(1, scale["users"] + 1), min(20, scale["users"])), "description": "load test",
+        "matchup_id": list(range(1, min(10, scale["matches"]) + 1)), "is_public": True}), False)),
+    ("league_members", ("POST", lambda rng, scale, run: (
+        "/pruve/leagues/%d/members" % rng.randint(1, scale["leagues"]),
+        {"users": rng.sample(range(1, scale["users"] + 1), min(20, scale["users"]))}), False)),
+    ("users_import", ("POST", lambda rng, scale, run: ("/pruve/users/import", {"users": [
+        {"email": "import-%s-%d@bench.pruve.app" % (run["tag"], next(run["ids"])), "name": "Imported User",
+         "picture": ""} for _ in range(1000)]}), True)),
+    ("tallies_reconcile", ("POST", lambda rng, scale, run: ("/pruve/tallies/reconcile", None), True)),
+])
+WRITE_ROUTES = {name for name, (method, _, _) in ROUTES.items() if method == "POST"}
+ADMIN_ROUTES = {"users_import", "tallies_reconcile"}
+# Non-2xx answers that are part of a route's normal behaviour under this load
+EXPECTED_STATUSES = {
+    "vote": {409},  # the drawn user already voted on the drawn poll
+    "comments_export": {503},  # over PRUVE_COMMENT_STREAM_MAX_STREAMS exports at once
+}
+
+
+def existing_user(uid):
+    # Login only needs the email to match; name and picture are kept as stored
+    return "user%d@bench.pruve.app" % uid, "Bench User", ""
+
+
+def vote_request(rng, scale):
+    # Seeded poll p owns options 3p-2..3p; users who already voted get a 409
+    poll_id = random_poll(rng, scale)
+    return ("/pruve/polls/%d/vote" % poll_id,
+            {"user_id": random_user(rng, scale), "option_id": (poll_id - 1) * 3 + rng.randint(1, 3)})
+
+
+def match_vote_request(rng, scale):
+    match_number = rng.randint(1, scale["matches"])
+    user_id = random_user(rng, scale)
+    team1 = 1 + (match_number - 1) % len(TEAMS)  # as seed_data.py schedules them
+    return ("/pruve/%d/match_vote_and_comment" % match_number,
+            {"match_vote": {"team_id": team1, "user_id": user_id},
+             "comment": {"user_id": user_id, "comment_text": "load test comment"}})
+
+
+class Client(threading.local):
+    """One keep-alive connection per thread."""
+
+    def __init__(self, base_url, token=None):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = "Bearer " + token
+        self.conn = None
+
+    def request(self, method, path, body=None, token=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = dict(self.headers, Authorization="Bearer " + token) if token else self.headers
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+            start = time.perf_counter()
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                size = len(response.read())
+            except (http.client.HTTPException, ConnectionError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+                continue
+            return response.status, size, time.perf_counter() - start
+
+
+def login(base_url):
+    client = Client(base_url)
+    email, name, picture = existing_user(1)
+    conn = http.client.HTTPConnection(client.host, client.port, timeout=30)
+    conn.request("POST", "/pruve/user", body=json.dumps({"email": email, "name": name, "picture": picture}),
+                 headers=client.headers)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    if response.status != 200:
+        print("login returned %d, running without a token" % response.status, file=sys.stderr)
+        return None
+    return json.loads(body).get("access_token")
+
+
+def drive(client, name, scale, run, requests, concurrency, warmup, seed, token=None):
+    method, build, _ = ROUTES[name]
+    rng = random.Random("%s:%s" % (seed, name))
+    calls = [build(rng, scale, run) for _ in range(warmup + requests)]
+    for path, body in calls[:warmup]:
+        client.request(method, path, body, token)
+
+    statuses = collections.Counter()
+    latencies, sizes = [], []
+    lock = threading.Lock()
+
+    def send(call):
+        path, body = call
+        try:
+            status, size, elapsed = client.request(method, path, body, token)
+        except OSError:
+            status, size, elapsed = "connection_error", 0, None
+        with lock:
+            statuses[status] += 1
+            sizes.append(size)
+            if elapsed is not None:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, calls[warmup:]))
+    elapsed = time.perf_counter() - start
+
+    expected = EXPECTED_STATUSES.get(name, ())
+    result = {
+        "method": method,
+        "requests": requests,
+        "errors": sum(count for status, count in statuses.items() if status == "connection_error" or status >= 500),
+        "unexpected": sum(count for status, count in statuses.items()
+                          if status == "connection_error" or not (200 <= status < 300 or status in expected)),
+        "status_counts": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(requests / elapsed, 1),
+    }
+    result.update(timings(latencies, (50, 95, 99), with_max=True))
+    result["mean_bytes"] = round(sum(sizes) / len(sizes)) if sizes else 0
+    return result
+
+
+def select_routes(names=None, read_only=False):
+    selected = list(names or ROUTES)
+    unknown = [name for name in selected if name not in ROUTES]
+    if unknown:
+        raise ValueError("unknown routes: %s" % ", ".join(unknown))
+    return [name for name in selected if not (read_only and name in WRITE_ROUTES)]
+
+
+def run(base_url, scale, routes, requests=200, heavy_requests=10, concurrency=16, warmup=5, seed=1, label=None,
+        admin_key=None):
+    token = login(base_url)
+    client = Client(base_url, token)
+    run_state = {"tag": "%x" % int(time.time()), "ids": iter(range(1, sys.maxsize))}
+    results = {"meta": {
+        "label": label,
+        "base_url": base_url,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "scale": scale,
+        "concurrency": concurrency,
+        "requests": requests,
+        "heavy_requests": heavy_requests,
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }, "routes": {}}
+    for name in routes:
+        if name in ADMIN_ROUTES and not admin_key:
+            print("%-24s skipped, no admin key" % name, file=sys.stderr)
+            continue
+        heavy = ROUTES[name][2]
+        count = heavy_requests if heavy else requests
+        results["routes"][name] = drive(client, name, scale, run_state, count, min(concurrency, count),
+                                        min(warmup, 1) if heavy else warmup, seed,
+                                        admin_key if name in ADMIN_ROUTES else None)
+        print("%-24s %s" % (name, summary_line(results["routes"][name])), file=sys.stderr)
+    return results
+
+
+def summary_line(route):
+    return "%8.1f req/s  p50 %8.2f ms  p95 %8.2f ms  p99 %8.2f ms  errors %d  unexpected %d" % (
+        route["requests_per_s"], route["p50_ms"], route["p95_ms"], route["p99_ms"], route["errors"],
+        route["unexpected"])
+
+
+def unexpected_routes(results, max_rate=0.0):
+    """(route, unexpected rate, status counts) for routes whose unexpected rate is over ``max_rate``."""
+    return [(name, route["unexpected"] / route["requests"], route["status_counts"])
+            for name, route in results["routes"].items()
+            if route["requests"] and route["unexpected"] / route["requests"] > max_rate]
+
+
+def compare(results, baseline):
+    """Rows of (route, metric, before, after, change %) for routes in both runs."""
+    rows = []
+    for name, route in results["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            continue
+        for metric in ("requests_per_s", "p50_ms", "p95_ms", "p99_ms"):
+            change = (route[metric] - before[metric]) / before[metric] * 100 if before[metric] else None
+            rows.append((name, metric, before[metric], route[metric], change))
+    return rows
+
+
+def print_comparison(rows, out=sys.stdout):
+    print("%-24s %-15s %12s %12s %9s" % ("route", "metric", "before", "after", "change"), file=out)
+    for name, metric, before, after, change in rows:
+        print("%-24s %-15s %12.2f %12.2f %9s" % (name, metric, before, after,
+                                                 "%+.1f%%" % change if change is not None else "-"), file=out)
+
+
+def add_load_arguments(parser):
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--heavy-requests", type=int, default=10, help="timed requests per bulk or export route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--routes", nargs="+", metavar="ROUTE", help="default: all of " + ", ".join(ROUTES))
+    parser.add_argument("--read-only", action="store_true", help="skip routes that write")
+    parser.add_argument("--admin-key", default=os.environ.get("PRUVE_ADMIN_KEY"),
+                        help="bearer token for the admin routes, default $PRUVE_ADMIN_KEY")
+    parser.add_argument("--max-unexpected-rate", type=float, default=0.0,
+                        help="fail when a route answers more than this share of requests with a status it does "
+                             "not expect, default 0")
+    parser.add_argument("--label", help="stored with the results, e.g. a branch name")
+    parser.add_argument("--output", help="results file, default pruve-bench-<time>.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file to compare against")
+
+
+def finish(results, args):
+    output = args.output or "pruve-bench-%s.json" % datetime.now().strftime("%Y%m%d-%H%M%S")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print("results written to %s" % output, file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(compare(results, json.load(f)))
+    failed = unexpected_routes(results, args.max_unexpected_rate)
+    for name, rate, status_counts in failed:
+        print("%-24s %.1f%% unexpected answers: %s" % (name, rate * 100, json.dumps(status_counts)), file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--seed", type=int, default=1)
+    add_scale_arguments(parser)
+    add_load_arguments(parser)
+    args = parser.parse_args()
+    try:
+        routes = select_routes(args.routes, args.read_only)
+    except ValueError as e:
+        parser.error(str(e))
+    results = run(args.base_url.rstrip("/"), scale_from_args(args), routes, args.requests, args.heavy_requests,
+                  args.concurrency, args.warmup, args.seed, args.label, args.admin_key)
+    finish(results, args)
+
+
+if __name__ == "__main__":
+    main()
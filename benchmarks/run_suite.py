@@ -0,0 +1,130 @@
+"""Seed a database, start pruve against it and run the load test, in one go.
+
+With ``--pgdata DIR`` a throwaway Postgres cluster is created in DIR (with
+initdb and pg_ctl from ``--pg-bin`` or PATH), listens only on a unix socket
+there, and is stopped afterwards. Otherwise ``--dsn`` names an existing
+scratch database. The app is served by uvicorn from ``--app-dir`` (this
+checkout by default), so two checkouts can be measured against the same data:
+
+    python benchmarks/run_suite.py --pgdata /tmp/pruve-bench --scale small --output main.json
+    python benchmarks/run_suite.py --pgdata /tmp/pruve-bench --scale small --app-dir ../pruve-branch \\
+        --output branch.json --compare main.json
+
+The database is reseeded on every run unless ``--skip-seed`` is given.
+"""
+import argparse
+import contextlib
+import os
+import secrets
+import shutil
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import load_test
+import seed_data
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def pg_command(bin_dir, name):
+    path = os.path.join(bin_dir, name) if bin_dir else shutil.which(name)
+    if not path or not os.path.exists(path):
+        raise SystemExit("%s not found; pass --pg-bin or --dsn" % name)
+    return path
+
+
+@contextlib.contextmanager
+def local_postgres(data_dir, bin_dir=None, port=5432):
+    """Run a Postgres cluster in ``data_dir`` for the duration; yields its DSN."""
+    data_dir = os.path.abspath(data_dir)
+    if not os.path.exists(os.path.join(data_dir, "PG_VERSION")):
+        subprocess.run([pg_command(bin_dir, "initdb"), "-D", data_dir, "-U", "postgres", "-A", "trust",
+                        "-E", "UTF8", "--no-sync"], check=True, stdout=subprocess.DEVNULL)
+    pg_ctl = pg_command(bin_dir, "pg_ctl")
+    subprocess.run([pg_ctl, "-D", data_dir, "-l", os.path.join(data_dir, "server.log"), "-w", "start",
+                    "-o", "-c listen_addresses='' -k %s -p %d" % (data_dir, port)], check=True,
+                   stdout=subprocess.DEVNULL)
+    try:
+        yield "postgresql://postgres@/postgres?host=%s&port=%d" % (data_dir, port)
+    finally:
+        subprocess.run([pg_ctl, "-D", data_dir, "-m", "fast", "-w", "stop"], stdout=subprocess.DEVNULL)
+
+
+@contextlib.contextmanager
+def pruve_server(app_dir, dsn, port, workers, admin_key, timeout=60):
+    """Serve pruve:app from ``app_dir`` with uvicorn; yields its base URL."""
+    env = dict(os.environ, PRUVE_DB_URI=dsn, PRUVE_ADMIN_KEY=admin_key)
+    # Every worker has to accept tokens the others issued
+    env.setdefault("PRUVE_JWT_KEYS", "bench:" + secrets.token_hex(32))
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "pruve:app", "--app-dir", app_dir,
+                               "--port", str(port), "--workers", str(workers), "--log-level", "warning"], env=env)
+    base_url = "http://127.0.0.1:%d" % port
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if server.poll() is not None:
+                raise SystemExit("pruve exited with %d before it was ready" % server.returncode)
+            try:
+                with urllib.request.urlopen(base_url + "/pruve/pool/stats", timeout=5):
+                    break
+            except (urllib.error.URLError, ConnectionError):
+                if time.monotonic() > deadline:
+                    raise SystemExit("pruve did not answer within %ds" % timeout)
+                time.sleep(0.5)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def git_commit(path):
+    try:
+        return subprocess.run(["git", "-C", path, "rev-parse", "--short", "HEAD"], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    database = parser.add_mutually_exclusive_group(required=True)
+    database.add_argument("--dsn", help="existing scratch database; its benchmark tables are dropped")
+    database.add_argument("--pgdata", help="directory for a throwaway Postgres cluster")
+    parser.add_argument("--pg-bin", help="directory holding initdb and pg_ctl")
+    parser.add_argument("--pg-port", type=int, default=5432)
+    parser.add_argument("--app-dir", default=REPO_DIR, help="checkout to serve pruve.py from")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    seed_data.add_scale_arguments(parser)
+    load_test.add_load_arguments(parser)
+    args = parser.parse_args()
+    try:
+        routes = load_test.select_routes(args.routes, args.read_only)
+    except ValueError as e:
+        parser.error(str(e))
+    scale = seed_data.scale_from_args(args)
+
+    with contextlib.ExitStack() as stack:
+        dsn = args.dsn or stack.enter_context(local_postgres(args.pgdata, args.pg_bin, args.pg_port))
+        if not args.skip_seed:
+            start = time.perf_counter()
+            seed_data.seed(dsn, scale, reset=True)
+            print("seeded %s scale in %.1fs" % (args.scale, time.perf_counter() - start), file=sys.stderr)
+        admin_key = args.admin_key or secrets.token_hex(16)
+        base_url = stack.enter_context(pruve_server(os.path.abspath(args.app_dir), dsn, args.port, args.workers,
+                                                    admin_key))
+        results = load_test.run(base_url, scale, routes, args.requests, args.heavy_requests, args.concurrency,
+                                args.warmup, args.seed, args.label, admin_key)
+
+    results["meta"].update({"app_dir": os.path.abspath(args.app_dir), "commit": git_commit(args.app_dir),
+                            "workers": args.workers})
+    load_test.finish(results, args)
+
+
+if __name__ == "__main__":
+    main()
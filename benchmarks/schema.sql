@@ -0,0 +1,172 @@
+-- Tables pruve.py reads and writes, for benchmark databases.
+-- Loaded by seed_data.py. Indexes the app creates itself at startup
+-- (ensure_poll_tables, ensure_comment_indexes, ensure_user_indexes) are left
+-- to it, so a benchmark also covers that path.
+
+CREATE TABLE users_pruve (
+    uid serial PRIMARY KEY,
+    email text NOT NULL,
+    name text NOT NULL,
+    picture text NOT NULL DEFAULT ''
+);
+
+CREATE TABLE team_list (
+    team_id serial PRIMARY KEY,
+    name text NOT NULL,
+    icon text NOT NULL DEFAULT '',
+    "nickName" text NOT NULL DEFAULT ''
+);
+
+CREATE TABLE matchschedule (
+    match_number serial PRIMARY KEY,
+    team1_id integer NOT NULL REFERENCES team_list (team_id),
+    team2_id integer NOT NULL REFERENCES team_list (team_id),
+    match_time timestamp,
+    venue text NOT NULL DEFAULT '',
+    type text NOT NULL DEFAULT 'matchcard',
+    description text NOT NULL DEFAULT '',
+    book_tickets text NOT NULL DEFAULT ''
+);
+
+CREATE TABLE match_vote_pruve (
+    vote_id serial PRIMARY KEY,
+    team_id integer NOT NULL,
+    match_number integer NOT NULL,
+    user_id integer NOT NULL
+);
+
+CREATE TABLE comments_table_pruve (
+    comment_id serial PRIMARY KEY,
+    type text NOT NULL DEFAULT 'comment',
+    user_id integer NOT NULL,
+    match_number integer NOT NULL,
+    vote_id integer,
+    comment_text text NOT NULL,
+    time timestamp NOT NULL DEFAULT now()
+);
+
+-- Feed sources behind /pruve/data
+CREATE TABLE matchschedulev2 (
+    id serial PRIMARY KEY,
+    team1 text NOT NULL,
+    team2 text NOT NULL,
+    time timestamp,
+    votecount1 integer NOT NULL DEFAULT 0,
+    votecount2 integer NOT NULL DEFAULT 0,
+    venue text NOT NULL DEFAULT '',
+    image1 text NOT NULL DEFAULT '',
+    image2 text NOT NULL DEFAULT '',
+    type text NOT NULL DEFAULT 'matchschedule'
+);
+
+CREATE TABLE conversation_tablev1 (
+    id serial PRIMARY KEY,
+    type text NOT NULL DEFAULT 'conversation',
+    "user" json NOT NULL,
+    time timestamp NOT NULL DEFAULT now(),
+    teams json NOT NULL DEFAULT '[]',
+    "predictionText" text NOT NULL DEFAULT '',
+    "commentCount" integer NOT NULL DEFAULT 0,
+    reactions json NOT NULL DEFAULT '[]',
+    link text NOT NULL DEFAULT ''
+);
+
+CREATE TABLE wildcard_tablev1 (
+    id serial PRIMARY KEY,
+    type text NOT NULL DEFAULT 'wildcard',
+    "user" json NOT NULL,
+    time timestamp NOT NULL DEFAULT now(),
+    totalvotes integer NOT NULL DEFAULT 0,
+    voterlist json NOT NULL DEFAULT '[]',
+    question text NOT NULL,
+    options json NOT NULL DEFAULT '[]'
+);
+
+CREATE TABLE league_pruve (
+    league_id serial PRIMARY KEY,
+    league_name text NOT NULL,
+    league_description text NOT NULL DEFAULT '',
+    type text NOT NULL DEFAULT 'private',
+    is_public boolean NOT NULL DEFAULT false,
+    creator_id integer NOT NULL
+);
+
+CREATE TABLE league_membership_pruve (
+    league_id integer NOT NULL,
+    user_id integer NOT NULL,
+    role text NOT NULL
+);
+
+CREATE TABLE league_matchup_pruve (
+    league_id integer NOT NULL,
+    matchup_schedule_id integer NOT NULL
+);
+
+CREATE TABLE poll_pruve (
+    poll_id serial PRIMARY KEY,
+    type text NOT NULL,
+    user_id integer NOT NULL,
+    question text NOT NULL,
+    created_at timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE option_pruve_v1 (
+    option_id serial PRIMARY KEY,
+    poll_id integer NOT NULL,
+    option_text text NOT NULL
+);
+
+CREATE TABLE answer_pruve (
+    answer_id serial PRIMARY KEY,
+    poll_id integer NOT NULL,
+    creator_id integer NOT NULL,
+    option_id integer NOT NULL,
+    answer_text text NOT NULL
+);
+
+CREATE TABLE vote_pruve (
+    vote_id serial PRIMARY KEY,
+    user_id integer NOT NULL,
+    poll_id integer NOT NULL,
+    option_id integer NOT NULL
+);
+
+-- Same as TALLY_TABLES_DDL in pruve.py, filled in by the seeder
+CREATE TABLE option_tally_pruve (
+    option_id integer PRIMARY KEY,
+    poll_id integer NOT NULL,
+    vote_count integer NOT NULL DEFAULT 0
+);
+CREATE INDEX option_tally_pruve_poll_id_idx ON option_tally_pruve (poll_id);
+CREATE TABLE poll_tally_pruve (
+    poll_id integer PRIMARY KEY,
+    total_votes integer NOT NULL DEFAULT 0
+);
+
+-- Older poll tables still behind /pruve/polls and /pruve/polls/{poll_id}
+CREATE TABLE users (
+    user_id serial PRIMARY KEY,
+    name text NOT NULL,
+    email text NOT NULL,
+    picture text NOT NULL DEFAULT ''
+);
+
+CREATE TABLE poll (
+    poll_id serial PRIMARY KEY,
+    type text NOT NULL DEFAULT 'wildcard',
+    user_id integer NOT NULL,
+    question text NOT NULL
+);
+
+CREATE TABLE option (
+    option_id serial PRIMARY KEY,
+    poll_id integer NOT NULL,
+    option_text text NOT NULL
+);
+
+CREATE TABLE vote (
+    vote_id serial PRIMARY KEY,
+    poll_id integer NOT NULL,
+    option_id integer NOT NULL,
+    user_id integer NOT NULL
+);
@@ -0,0 +1,251 @@
+"""Create the pruve schema and fill it with synthetic data at a chosen scale.
+
+Loads ``schema.sql`` and generates users, teams and matches, match votes
+and comments, feed items, leagues, polls with options, answers, votes and
+tallies, and the older poll tables. Everything is generated inside Postgres
+from a fixed seed, so the same scale always produces the same data. Point
+it at a scratch database: ``--reset`` drops every table in schema.sql
+first.
+
+    python benchmarks/seed_data.py --dsn postgresql://... --scale small --reset
+    python benchmarks/seed_data.py --dsn postgresql://... --scale medium --comments 1000000 --reset
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+import psycopg2
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+SCALES = {
+    "small": {"users": 1000, "polls": 200, "votes_per_poll": 20, "comments": 10000, "matches": 70, "leagues": 20,
+              "league_members": 50, "feed_items": 500, "legacy_polls": 100},
+    "medium": {"users": 20000, "polls": 2000, "votes_per_poll": 100, "comments": 200000, "matches": 70,
+               "leagues": 200, "league_members": 500, "feed_items": 3000, "legacy_polls": 300},
+    "large": {"users": 200000, "polls": 20000, "votes_per_poll": 500, "comments": 2000000, "matches": 74,
+              "leagues": 2000, "league_members": 2000, "feed_items": 20000, "legacy_polls": 1000},
+}
+
+TEAMS = [
+    ("Chennai Super Kings", "CSK"), ("Mumbai Indians", "MI"), ("Royal Challengers Bengaluru", "RCB"),
+    ("Kolkata Knight Riders", "KKR"), ("Sunrisers Hyderabad", "SRH"), ("Delhi Capitals", "DC"),
+    ("Punjab Kings", "PBKS"), ("Rajasthan Royals", "RR"), ("Gujarat Titans", "GT"), ("Lucknow Super Giants", "LSG"),
+]
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ayaan", "Krishna", "Ishaan",
+               "Ananya", "Diya", "Aadhya", "Saanvi", "Myra", "Anika", "Kiara", "Pari", "Riya", "Meera",
+               "Rohan", "Kabir", "Dev", "Nikhil", "Rahul", "Priya", "Neha", "Pooja", "Sneha", "Kavya"]
+LAST_NAMES = ["Sharma", "Verma", "Gupta", "Iyer", "Nair", "Reddy", "Patel", "Shah", "Mehta", "Rao",
+              "Kumar", "Singh", "Das", "Bose", "Chatterjee", "Menon", "Pillai", "Joshi", "Kulkarni", "Desai"]
+
+RANDOM_NAME = ("(%(first_names)s::text[])[1 + floor(random() * cardinality(%(first_names)s::text[]))::int] || ' ' || "
+               "(%(last_names)s::text[])[1 + floor(random() * cardinality(%(last_names)s::text[]))::int]")
+RANDOM_USER = "1 + floor(random() * %(users)s)::int"
+
+# (label, statement); run in order, each with the scale as parameters
+STEPS = [
+    ("users_pruve", """
+        INSERT INTO users_pruve (uid, email, name, picture)
+        SELECT g, 'user' || g || '@bench.pruve.app', """ + RANDOM_NAME + """, 'https://cdn.pruve.app/u/' || g || '.png'
+        FROM generate_series(1, %(users)s) AS g
+    """),
+    ("team_list", """
+        INSERT INTO team_list (team_id, name, "nickName", icon)
+        SELECT n, t.name, t.nick, 'https://cdn.pruve.app/teams/' || lower(t.nick) || '.png'
+        FROM unnest(%(team_names)s::text[], %(team_nicks)s::text[]) WITH ORDINALITY AS t(name, nick, n)
+    """),
+    ("matchschedule", """
+        INSERT INTO matchschedule (match_number, team1_id, team2_id, match_time, venue, description)
+        SELECT g, t1, 1 + (t1 + (g - 1) / %(teams)s %% (%(teams)s - 1)) %% %(teams)s,
+            date_trunc('day', now()) - interval '20 days' + g * interval '1 day' + interval '19 hours 30 minutes',
+            'Stadium ' || (1 + g %% 12), 'Match ' || g
+        FROM generate_series(1, %(matches)s) AS g, LATERAL (SELECT 1 + (g - 1) %% %(teams)s AS t1) AS t
+    """),
+    ("match_vote_pruve", """
+        INSERT INTO match_vote_pruve (vote_id, team_id, match_number, user_id)
+        SELECT g, CASE WHEN random() < 0.5 THEN m.team1_id ELSE m.team2_id END, m.match_number, """ + RANDOM_USER + """
+        FROM generate_series(1, %(comments)s) AS g
+        JOIN matchschedule AS m ON m.match_number = 1 + g %% %(matches)s
+    """),
+    ("comments_table_pruve", """
+        INSERT INTO comments_table_pruve (comment_id, user_id, match_number, vote_id, comment_text, time)
+        SELECT v.vote_id, v.user_id, v.match_number, v.vote_id,
+            'Comment ' || v.vote_id || ': ' || (ARRAY['what a game', 'easy win', 'too close to call',
+                                                      'toss decides it', 'bowlers on top'])[1 + v.vote_id %% 5],
+            now() - (%(comments)s - v.vote_id) * interval '1 second'
+        FROM match_vote_pruve AS v
+    """),
+    ("matchschedulev2", """
+        INSERT INTO matchschedulev2 (id, team1, team2, time, votecount1, votecount2, venue, image1, image2)
+        SELECT g, t1.name, t2.name, now() - (%(feed_items)s - g) * interval '1 minute',
+            floor(random() * 1000)::int, floor(random() * 1000)::int, 'Stadium ' || (1 + g %% 12), t1.icon, t2.icon
+        FROM generate_series(1, %(feed_items)s) AS g
+        JOIN team_list AS t1 ON t1.team_id = 1 + g %% %(teams)s
+        JOIN team_list AS t2 ON t2.team_id = 1 + (g + 1) %% %(teams)s
+    """),
+    ("conversation_tablev1", """
+        INSERT INTO conversation_tablev1 (id, "user", time, teams, "predictionText", "commentCount", reactions, link)
+        SELECT g, json_build_object('uid', u.uid, 'name', u.name, 'picture', u.picture),
+            now() - (%(feed_items)s - g) * interval '1 minute' - interval '20 seconds',
+            json_build_array(json_build_object('nickName', 'CSK'), json_build_object('nickName', 'MI')),
+            'Prediction ' || g, floor(random() * 50)::int,
+            json_build_array(json_build_object('emoji', 'fire', 'count', floor(random() * 20)::int)),
+            'https://pruve.app/c/' || g
+        FROM generate_series(1, %(feed_items)s) AS g
+        JOIN users_pruve AS u ON u.uid = 1 + g %% %(users)s
+    """),
+    ("wildcard_tablev1", """
+        INSERT INTO wildcard_tablev1 (id, "user", time, totalvotes, voterlist, question, options)
+        SELECT g, json_build_object('uid', u.uid, 'name', u.name, 'picture', u.picture),
+            now() - (%(feed_items)s - g) * interval '1 minute' - interval '40 seconds', 20,
+            (SELECT json_agg(name) FROM users_pruve WHERE uid BETWEEN 1 + g %% %(users)s AND 20 + g %% %(users)s),
+            'Wildcard question ' || g || '?', json_build_array('Yes', 'No')
+        FROM generate_series(1, %(feed_items)s) AS g
+        JOIN users_pruve AS u ON u.uid = 1 + g %% %(users)s
+    """),
+    ("league_pruve", """
+        INSERT INTO league_pruve (league_id, league_name, league_description, type, is_public, creator_id)
+        SELECT g, 'League ' || g, 'Benchmark league ' || g, 'private', g %% 2 = 0, 1 + (g * 7919) %% %(users)s
+        FROM generate_series(1, %(leagues)s) AS g
+    """),
+    ("league_membership_pruve", """
+        INSERT INTO league_membership_pruve (league_id, user_id, role)
+        SELECT l.league_id, 1 + (l.creator_id - 1 + i) %% %(users)s, CASE WHEN i = 0 THEN 'creator' ELSE 'role player' END
+        FROM league_pruve AS l, generate_series(0, LEAST(%(league_members)s, %(users)s) - 1) AS i
+    """),
+    ("league_matchup_pruve", """
+        INSERT INTO league_matchup_pruve (league_id, matchup_schedule_id)
+        SELECT l.league_id, m.match_number
+        FROM league_pruve AS l JOIN matchschedule AS m ON m.match_number <= 10
+    """),
+    ("poll_pruve", """
+        INSERT INTO poll_pruve (poll_id, type, user_id, question, created_at)
+        SELECT g, 'wildcard', """ + RANDOM_USER + """, 'poll ' || g || ': who wins the toss?',
+            now() - (%(polls)s - g) * interval '1 minute'
+        FROM generate_series(1, %(polls)s) AS g
+    """),
+    ("option_pruve_v1", """
+        INSERT INTO option_pruve_v1 (option_id, poll_id, option_text)
+        SELECT (p - 1) * 3 + k, p, (ARRAY['csk', 'mi', 'no result'])[k]
+        FROM generate_series(1, %(polls)s) AS p, generate_series(1, 3) AS k
+    """),
+    ("answer_pruve", """
+        INSERT INTO answer_pruve (answer_id, poll_id, creator_id, option_id, answer_text)
+        SELECT p.poll_id, p.poll_id, p.user_id, o.option_id, o.option_text
+        FROM poll_pruve AS p
+        JOIN option_pruve_v1 AS o ON o.option_id = (p.poll_id - 1) * 3 + 1 + p.poll_id %% 3
+    """),
+    ("vote_pruve", """
+        INSERT INTO vote_pruve (user_id, poll_id, option_id)
+        SELECT 1 + (p * 7919 + i) %% %(users)s, p, (p - 1) * 3 + 1 + floor(random() * 3)::int
+        FROM generate_series(1, %(polls)s) AS p, generate_series(0, LEAST(%(votes_per_poll)s, %(users)s) - 1) AS i
+    """),
+    ("option_tally_pruve", """
+        INSERT INTO option_tally_pruve (option_id, poll_id, vote_count)
+        SELECT o.option_id, o.poll_id, COUNT(v.vote_id)
+        FROM option_pruve_v1 AS o LEFT JOIN vote_pruve AS v ON v.option_id = o.option_id
+        GROUP BY o.option_id, o.poll_id
+    """),
+    ("poll_tally_pruve", """
+        INSERT INTO poll_tally_pruve (poll_id, total_votes)
+        SELECT p.poll_id, COUNT(v.vote_id)
+        FROM poll_pruve AS p LEFT JOIN vote_pruve AS v ON v.poll_id = p.poll_id
+        GROUP BY p.poll_id
+    """),
+    ("users", """
+        INSERT INTO users (user_id, name, email, picture)
+        SELECT uid, name, email, picture FROM users_pruve WHERE uid <= 1000
+    """),
+    ("poll", """
+        INSERT INTO poll (poll_id, user_id, question)
+        SELECT g, 1 + (g * 31) %% LEAST(%(users)s, 1000), 'legacy poll ' || g || '?'
+        FROM generate_series(1, %(legacy_polls)s) AS g
+    """),
+    ("option", """
+        INSERT INTO option (option_id, poll_id, option_text)
+        SELECT (p - 1) * 3 + k, p, (ARRAY['yes', 'no', 'maybe'])[k]
+        FROM generate_series(1, %(legacy_polls)s) AS p, generate_series(1, 3) AS k
+    """),
+    ("vote", """
+        INSERT INTO vote (poll_id, option_id, user_id)
+        SELECT p, (p - 1) * 3 + 1 + floor(random() * 3)::int, 1 + (p * 7 + i) %% LEAST(%(users)s, 1000)
+        FROM generate_series(1, %(legacy_polls)s) AS p, generate_series(0, LEAST(20, %(users)s) - 1) AS i
+    """),
+]
+
+
+def schema_tables():
+    with open(SCHEMA_PATH) as schema:
+        return re.findall(r"CREATE TABLE (\w+)", schema.read())
+
+
+def seed(dsn, scale, reset=False, seed=0.42):
+    """Create the schema in ``dsn`` and fill it; returns rows and seconds per table."""
+    params = dict(scale, teams=len(TEAMS), team_names=[name for name, _ in TEAMS],
+                  team_nicks=[nick for _, nick in TEAMS], first_names=FIRST_NAMES, last_names=LAST_NAMES)
+    report = {}
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            if reset:
+                cur.execute("DROP TABLE IF EXISTS %s CASCADE" % ", ".join(schema_tables()))
+            with open(SCHEMA_PATH) as schema:
+                cur.execute(schema.read())
+            cur.execute("SELECT setseed(%s)", (seed,))
+            for table, statement in STEPS:
+                start = time.perf_counter()
+                cur.execute(statement, params)
+                report[table] = {"rows": cur.rowcount, "seconds": round(time.perf_counter() - start, 2)}
+
+            # Ids above were set explicitly; move the sequences past them
+            cur.execute("""
+                SELECT c.table_name, c.column_name
+                FROM information_schema.columns AS c
+                WHERE c.table_name = ANY(%s) AND c.column_default LIKE 'nextval(%%'
+            """, (schema_tables(),))
+            for table, column in cur.fetchall():
+                cur.execute("SELECT setval(pg_get_serial_sequence(%%s, %%s), COALESCE(MAX(%s), 0) + 1, false) FROM %s"
+                            % (column, table), (table, column))
+        conn.commit()
+
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE")
+    finally:
+        conn.close()
+    return report
+
+
+def scale_from_args(args):
+    scale = dict(SCALES[args.scale])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    return scale
+
+
+def add_scale_arguments(parser):
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for key in SCALES["small"]:
+        parser.add_argument("--" + key.replace("_", "-"), type=int, help="overrides the --scale preset")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=os.environ.get("PRUVE_DB_URI"), help="defaults to $PRUVE_DB_URI")
+    parser.add_argument("--reset", action="store_true", help="drop the benchmark tables first")
+    parser.add_argument("--seed", type=float, default=0.42, help="passed to setseed(), between -1 and 1")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn or PRUVE_DB_URI is required")
+    scale = scale_from_args(args)
+    start = time.perf_counter()
+    tables = seed(args.dsn, scale, reset=args.reset, seed=args.seed)
+    print(json.dumps({"scale": scale, "tables": tables, "seconds": round(time.perf_counter() - start, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
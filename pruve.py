@@ -1,15 +1,88 @@
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Request, Response, Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
 from typing import List, Optional, Union
 import jwt
 import psycopg2
-from fastapi.responses import JSONResponse
-from datetime import datetime
+import psycopg2.pool
+from psycopg2 import extensions
+from fastapi.responses import JSONResponse, StreamingResponse
+from datetime import datetime, timezone
 from typing import List,Dict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict
+from rapidfuzz import fuzz
+import asyncio
+import atexit
+import base64
+import binascii
+import contextvars
+import csv
+import functools
+import heapq
+import io
+import itertools
+import json
+import os
+import re
 import secrets
+import select
+import threading
+import time
 
+try:
+    import orjson
+except ImportError:  # optional, speeds up FastJSONResponse
+    orjson = None
 
-app = FastAPI(title="pruve - API", docs_url="/pruve/docs", openapi_url="/pruve/openapi.json")
+
+class RequestMetrics:
+    """Database and serialization work done while serving one request.
+
+    The middleware sets one per request in ``current_request_metrics``;
+    pool cursors and the JSON encoders add to it from whichever thread the
+    work runs on.
+    """
+
+    __slots__ = ("queries", "rows", "db_time", "serialization_time", "_lock")
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self._lock = threading.Lock()
+
+    def add_db(self, seconds: float, queries: int = 0, rows: int = 0):
+        with self._lock:
+            self.queries += queries
+            self.rows += rows
+            self.db_time += seconds
+
+    def add_serialization(self, seconds: float):
+        with self._lock:
+            self.serialization_time += seconds
+
+
+current_request_metrics = contextvars.ContextVar("pruve_request_metrics", default=None)
+
+
+class InstrumentedJSONResponse(JSONResponse):
+    """The default response class, timing how long rendering the body takes."""
+
+    def render(self, content) -> bytes:
+        start = time.perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            metrics = current_request_metrics.get()
+            if metrics is not None:
+                metrics.add_serialization(time.perf_counter() - start)
+
+
+app = FastAPI(title="pruve - API", docs_url="/pruve/docs", openapi_url="/pruve/openapi.json",
+              default_response_class=InstrumentedJSONResponse)
 
 
 
@@ -20,23 +93,930 @@ DB_PORT = "XXXXXXX"
 DB_NAME = "XXXXXX"
 DB_USER = "XXXXXX"
 DB_PASSWORD = "XXXXXXXXXXXXXX"
-DB_URI = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-conn = psycopg2.connect(DB_URI)
-cur = conn.cursor()
-# JWT Secret Key
-JWT_SECRET_KEY = secrets.token_urlsafe(64)
+DB_URI = os.environ.get("PRUVE_DB_URI", f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+
+# Connection pool configuration
+DB_POOL_MIN_SIZE = int(os.environ.get("PRUVE_DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.environ.get("PRUVE_DB_POOL_MAX_SIZE", 20))
+DB_POOL_TIMEOUT = float(os.environ.get("PRUVE_DB_POOL_TIMEOUT", 10))  # seconds to wait for a free connection
+DB_POOL_CHECK_IDLE = float(os.environ.get("PRUVE_DB_POOL_CHECK_IDLE", 30))  # ping connections idle longer than this
+# The async endpoints get their own executor and pool, sized one connection per worker thread
+ASYNC_DB_POOL_MIN_SIZE = int(os.environ.get("PRUVE_ASYNC_DB_POOL_MIN_SIZE", 2))
+ASYNC_DB_POOL_MAX_SIZE = int(os.environ.get("PRUVE_ASYNC_DB_POOL_MAX_SIZE", 10))
+# Exports of every comment (GET /pruve/comments/) running at once. Each keeps a db_pool
+# connection until its client has read the whole body; the ones over the cap get a 503
+COMMENT_STREAM_MAX_STREAMS = int(os.environ.get("PRUVE_COMMENT_STREAM_MAX_STREAMS", 4))
+
+# Read-through cache for the feed tables (conversations, wildcards, match schedule)
+QUERY_CACHE_TTL = float(os.environ.get("PRUVE_QUERY_CACHE_TTL", 30))  # seconds; 0 disables caching
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("PRUVE_QUERY_CACHE_MAX_ENTRIES", 256))
+
+# Seconds between rebuilds of the vote tallies from vote_pruve; 0 leaves it to POST /pruve/tallies/reconcile
+TALLY_RECONCILE_INTERVAL = float(os.environ.get("PRUVE_TALLY_RECONCILE_INTERVAL", 0))
+
+# Live tally push: committed votes are announced on this LISTEN/NOTIFY channel and
+# each worker sends subscribers at most one coalesced update per topic per interval
+TALLY_CHANNEL = os.environ.get("PRUVE_TALLY_CHANNEL", "pruve_tally")
+TALLY_PUSH_INTERVAL = float(os.environ.get("PRUVE_TALLY_PUSH_INTERVAL", 0.25))  # seconds
+
+# Profiles (name, picture, email) served from memory instead of joining users_pruve
+USER_PROFILE_CACHE_TTL = float(os.environ.get("PRUVE_USER_PROFILE_CACHE_TTL", 300))  # seconds
+USER_PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get("PRUVE_USER_PROFILE_CACHE_MAX_ENTRIES", 100000))
+
+# Matches each user has voted on, kept in memory to filter the match cards
+VOTED_MATCHES_CACHE_TTL = float(os.environ.get("PRUVE_VOTED_MATCHES_CACHE_TTL", 300))  # seconds
+VOTED_MATCHES_CACHE_MAX_ENTRIES = int(os.environ.get("PRUVE_VOTED_MATCHES_CACHE_MAX_ENTRIES", 100000))
+
+# Conditional GETs: read endpoints send an ETag built from per-resource change stamps
+# and answer a matching If-None-Match with 304 without querying. The stamps only move
+# on writes made through the API; a table edited directly needs POST /pruve/cache/invalidate
+ETAGS = os.environ.get("PRUVE_ETAGS", "true").lower() in ("1", "true", "yes")
+
+# Seconds between checks for users added by other workers to the search index
+USER_SEARCH_REFRESH_INTERVAL = float(os.environ.get("PRUVE_USER_SEARCH_REFRESH_INTERVAL", 5))
+
+# JWT signing keys as comma separated "kid:secret" pairs. Tokens are signed with
+# PRUVE_JWT_ACTIVE_KID (the first key by default) and accepted with any listed key:
+# to rotate, add the new key, make it active, and drop the old one once its tokens expire.
+JWT_KEYS = dict(pair.strip().split(":", 1) for pair in os.environ.get("PRUVE_JWT_KEYS", "").split(",") if pair.strip())
+if not JWT_KEYS:
+    print("PRUVE_JWT_KEYS is not set: using a random key, tokens will only work on this worker until it restarts")
+    JWT_KEYS = {"dev": secrets.token_urlsafe(64)}
+JWT_ACTIVE_KID = os.environ.get("PRUVE_JWT_ACTIVE_KID", next(iter(JWT_KEYS)))
+if JWT_ACTIVE_KID not in JWT_KEYS:
+    raise ValueError("PRUVE_JWT_ACTIVE_KID %r is not one of PRUVE_JWT_KEYS" % JWT_ACTIVE_KID)
+JWT_TOKEN_TTL = int(os.environ.get("PRUVE_JWT_TOKEN_TTL", 30 * 24 * 3600))  # seconds
+JWT_VERIFY_CACHE_SIZE = int(os.environ.get("PRUVE_JWT_VERIFY_CACHE_SIZE", 10000))
+# Reject writes without a bearer token; off until every client sends the token from /pruve/user
+REQUIRE_AUTH = os.environ.get("PRUVE_REQUIRE_AUTH", "false").lower() in ("1", "true", "yes")
+# Bearer token for the admin routes (cache invalidation, tally rebuilds, bulk user import).
+# Checked whatever PRUVE_REQUIRE_AUTH says; while it is unset those routes are closed
+ADMIN_KEY = os.environ.get("PRUVE_ADMIN_KEY", "")
+
+# Requests running more queries than this are counted (and the first one per route logged) as likely N+1s
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("PRUVE_N_PLUS_ONE_THRESHOLD", 10))
+
+
+class InstrumentedCursor(extensions.cursor):
+    """Cursor that adds its query count, rows fetched and time spent to the current request's metrics."""
+
+    def _record(self, start: float, queries: int = 0, rows: int = 0):
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.add_db(time.perf_counter() - start, queries, rows)
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._record(start, queries=1)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._record(start, queries=1)
+
+    def copy_expert(self, sql, file, size=8192):
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            self._record(start, queries=1)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._record(start, rows=row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._record(start, rows=len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._record(start, rows=len(rows))
+        return rows
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections.
+
+    Use ``with pool.connection() as conn:`` to check a connection out for the
+    duration of a request. Whatever the block leaves uncommitted is rolled
+    back when the connection is returned, and connections that are closed or
+    fail a liveness check are thrown away instead of being handed out again.
+    """
+
+    def __init__(self, dsn: str, min_size: int = 2, max_size: int = 20,
+                 timeout: float = 10.0, check_idle: float = 30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("invalid pool size: min_size=%s max_size=%s" % (min_size, max_size))
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_idle = check_idle
+
+        self._cond = threading.Condition()
+        self._idle = []  # (connection, last returned at) pairs, most recent last
+        self._size = 0  # connections opened by the pool, idle or checked out
+        self._opened = False
+        self._closed = False
+
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def open(self):
+        """Open the first ``min_size`` connections. Called on first checkout."""
+        with self._cond:
+            if self._opened:
+                return
+            self._opened = True
+            while self._size < self.min_size:
+                self._idle.append((psycopg2.connect(self.dsn, cursor_factory=InstrumentedCursor), time.monotonic()))
+                self._size += 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                conn.close()
+            self._size -= len(self._idle)
+            self._idle = []
+            self._cond.notify_all()
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Check out a connection, waiting up to ``timeout`` seconds for one to free up."""
+        if not self._opened:
+            self.open()
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            conn, last_used = self._reserve(deadline)
+            if conn is None:
+                conn = self._connect()
+                break
+            if self._is_usable(conn, last_used):
+                break
+            self._discard(conn)
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._checkouts += 1
+            self._wait_time += waited
+            self._max_wait_time = max(self._max_wait_time, waited)
+        return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection to the pool, rolling back any open transaction."""
+        if not discard and not conn.closed:
+            status = conn.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+
+        if discard or conn.closed or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except BaseException as e:  # GeneratorExit too, when a streamed response is abandoned
+            broken = conn.closed or isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            self.putconn(conn, discard=broken)
+            raise
+        else:
+            self.putconn(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_time_total": round(self._wait_time, 6),
+                "wait_time_avg": round(self._wait_time / self._checkouts, 6) if self._checkouts else 0.0,
+                "wait_time_max": round(self._max_wait_time, 6),
+            }
+
+    def _reserve(self, deadline: float):
+        # Hand out an idle connection, or reserve a slot for a new one
+        # (returned as None), or wait until another request gives one back.
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout("timed out waiting for a database connection")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _connect(self):
+        try:
+            return psycopg2.connect(self.dsn, cursor_factory=InstrumentedCursor)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _is_usable(self, conn, last_used: float) -> bool:
+        if conn.closed or conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - last_used < self.check_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+
+db_pool = ConnectionPool(DB_URI, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE,
+                         timeout=DB_POOL_TIMEOUT, check_idle=DB_POOL_CHECK_IDLE)
+atexit.register(db_pool.close)
+
+async_db_pool = ConnectionPool(DB_URI, min_size=ASYNC_DB_POOL_MIN_SIZE, max_size=ASYNC_DB_POOL_MAX_SIZE,
+                               timeout=DB_POOL_TIMEOUT, check_idle=DB_POOL_CHECK_IDLE)
+db_executor = ThreadPoolExecutor(max_workers=ASYNC_DB_POOL_MAX_SIZE, thread_name_prefix="pruve-db")
+atexit.register(async_db_pool.close)
+atexit.register(db_executor.shutdown, wait=False)
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database function on ``db_executor`` and await its result.
+
+    ``async def`` endpoints must not call psycopg2 directly: a query would
+    block the event loop, and every other in-flight request on the worker
+    with it. Functions run here should use ``async_db_pool``, which has one
+    connection per executor thread, so they never wait on a checkout.
+    """
+    loop = asyncio.get_running_loop()
+    # Carry the request's context over, so its queries count towards its metrics
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(db_executor, functools.partial(context.run, func, *args, **kwargs))
+
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    return JSONResponse(content={"error": str(exc)}, status_code=503)
+
+
+@app.get("/pruve/pool/stats")
+def get_pool_stats():
+    return {"db_pool": db_pool.stats(), "async_db_pool": async_db_pool.stats()}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the shape Prometheus expects."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _prometheus_labels(labels: dict) -> str:
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in labels.values())
+    return ",".join('%s="%s"' % (name, value) for name, value in zip(labels, escaped))
+
+
+class RouteMetrics:
+    """Per-route request counts and histograms, rendered in the Prometheus text format.
+
+    Like the other stats in this module they cover this worker only; a
+    scraper sees one worker per scrape, so run one target per worker to
+    collect them all.
+    """
+
+    SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+    ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+    # name -> (help, buckets, RequestMetrics attribute or None for total latency)
+    HISTOGRAMS = {
+        "pruve_http_request_duration_seconds": (
+            "Time from receiving the request to sending the last byte of the response.", SECONDS_BUCKETS, None),
+        "pruve_db_queries_per_request": ("Queries executed per request.", QUERY_BUCKETS, "queries"),
+        "pruve_db_rows_per_request": ("Rows fetched per request.", ROW_BUCKETS, "rows"),
+        "pruve_db_time_seconds": ("Time per request spent executing queries and fetching rows.",
+                                  SECONDS_BUCKETS, "db_time"),
+        "pruve_serialization_seconds": ("Time per request spent encoding response bodies as JSON.",
+                                        SECONDS_BUCKETS, "serialization_time"),
+    }
+
+    def __init__(self, n_plus_one_threshold: int = 10):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._requests = Counter()  # (route, method, status) -> requests
+        self._n_plus_one = Counter()  # (route, method) -> requests over the threshold
+        self._histograms = {}  # (name, route, method) -> Histogram
+
+    def observe(self, route: str, method: str, status: int, duration: float, metrics: RequestMetrics):
+        with self._lock:
+            self._requests[route, method, status] += 1
+            for name, (_, buckets, attribute) in self.HISTOGRAMS.items():
+                histogram = self._histograms.get((name, route, method))
+                if histogram is None:
+                    histogram = self._histograms[name, route, method] = Histogram(buckets)
+                histogram.observe(duration if attribute is None else getattr(metrics, attribute))
+            flagged = metrics.queries > self.n_plus_one_threshold
+            if flagged:
+                self._n_plus_one[route, method] += 1
+                first = self._n_plus_one[route, method] == 1
+        if flagged and first:
+            print("Possible N+1: %s %s ran %d queries (threshold %d); further ones are only counted in "
+                  "pruve_n_plus_one_requests_total" % (method, route, metrics.queries, self.n_plus_one_threshold))
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            lines += ["# HELP pruve_http_requests_total Requests served, by route, method and status.",
+                      "# TYPE pruve_http_requests_total counter"]
+            for (route, method, status), count in sorted(self._requests.items()):
+                labels = _prometheus_labels({"route": route, "method": method, "status": status})
+                lines.append("pruve_http_requests_total{%s} %d" % (labels, count))
+
+            lines += ["# HELP pruve_n_plus_one_requests_total Requests that ran more than %d queries."
+                      % self.n_plus_one_threshold, "# TYPE pruve_n_plus_one_requests_total counter"]
+            for (route, method), count in sorted(self._n_plus_one.items()):
+                labels = _prometheus_labels({"route": route, "method": method})
+                lines.append("pruve_n_plus_one_requests_total{%s} %d" % (labels, count))
+
+            for name, (help_text, buckets, _) in self.HISTOGRAMS.items():
+                lines += ["# HELP %s %s" % (name, help_text), "# TYPE %s histogram" % name]
+                for (histogram_name, route, method), histogram in sorted(self._histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    labels = _prometheus_labels({"route": route, "method": method})
+                    for bound, count in zip(buckets, histogram.counts):
+                        lines.append('%s_bucket{%s,le="%s"} %d' % (name, labels, bound, count))
+                    lines.append('%s_bucket{%s,le="+Inf"} %d' % (name, labels, histogram.count))
+                    lines.append("%s_sum{%s} %r" % (name, labels, histogram.sum))
+                    lines.append("%s_count{%s} %d" % (name, labels, histogram.count))
+        return "\n".join(lines) + "\n"
+
+
+route_metrics = RouteMetrics(n_plus_one_threshold=N_PLUS_ONE_THRESHOLD)
+
+
+def _route_label(scope) -> str:
+    # The matched route's path template, so /pruve/polls/1 and /pruve/polls/2 share a series
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        for candidate in scope["app"].routes:
+            if getattr(candidate, "endpoint", None) is endpoint:
+                return candidate.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording every HTTP request in ``route_metrics``.
+
+    Plain ASGI rather than BaseHTTPMiddleware so the timing runs until the
+    last chunk of a streamed response has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        status = 500  # unless the app gets as far as starting a response
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request_metrics.reset(token)
+            route_metrics.observe(_route_label(scope), scope["method"], status, time.perf_counter() - start, metrics)
+
+
+app.add_middleware(MetricsMiddleware)
+
+
+def _pool_metrics() -> List[str]:
+    lines = []
+    gauges = (("pruve_db_pool_connections", "Connections opened by the pool.", "size", "gauge"),
+              ("pruve_db_pool_in_use", "Connections checked out.", "in_use", "gauge"),
+              ("pruve_db_pool_waiting", "Threads waiting for a connection.", "waiting", "gauge"),
+              ("pruve_db_pool_checkouts_total", "Connections handed out.", "checkouts", "counter"),
+              ("pruve_db_pool_timeouts_total", "Checkouts that gave up waiting.", "timeouts", "counter"))
+    stats = {"db_pool": db_pool.stats(), "async_db_pool": async_db_pool.stats()}
+    for name, help_text, key, kind in gauges:
+        lines += ["# HELP %s %s" % (name, help_text), "# TYPE %s %s" % (name, kind)]
+        for pool, pool_stats in stats.items():
+            lines.append('%s{pool="%s"} %d' % (name, pool, pool_stats[key]))
+    return lines
+
+
+@app.get("/pruve/metrics")
+def get_metrics():
+    """Request, query and pool metrics for this worker in the Prometheus text format."""
+    body = route_metrics.render() + "\n".join(_pool_metrics()) + "\n"
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class TTLCache:
+    """Thread-safe LRU map whose entries expire, with hit, miss and eviction counters.
+
+    Subclasses build their lookups on ``_lookup`` and ``_store``, which
+    expect the caller to hold ``_lock`` so a subclass can fold several steps
+    into one critical section. Entries expire ``ttl`` seconds after they are
+    stored unless ``_store`` is given its own deadline; a ``ttl`` or
+    ``max_entries`` below 1 stores nothing.
+    """
+
+    def __init__(self, ttl: Optional[float] = 300.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires at, value), least recently used first
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        """The cached value for ``key``, or None."""
+        with self._lock:
+            return self._lookup(key)[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "evictions": self._evictions,
+            }
+
+    def _lookup(self, key):
+        """(found, value) for ``key``, counting a hit or a miss; drops the entry if it has expired."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self._misses += 1
+        return False, None
+
+    def _store(self, key, value, expires_at: Optional[float] = None):
+        if expires_at is None:
+            if self.ttl <= 0:
+                return
+            expires_at = time.monotonic() + self.ttl
+        if self.max_entries < 1:
+            return
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+class VerifiedTokenCache(TTLCache):
+    """Thread-safe LRU of tokens whose signature has been checked, with their claims.
+
+    Each entry expires with its token's ``exp``, so a cached token is never
+    accepted for longer than verifying it again would have been.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        super().__init__(ttl=None, max_entries=max_entries)
+
+    def put(self, token: str, claims: dict):
+        exp = claims.get("exp")
+        # exp is wall-clock time; entries expire on the monotonic clock
+        expires_at = float("inf") if exp is None else time.monotonic() + exp - time.time()
+        with self._lock:
+            self._store(token, claims, expires_at)
+
+
+verified_tokens = VerifiedTokenCache(max_entries=JWT_VERIFY_CACHE_SIZE)
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def verify_access_token(token: str) -> dict:
+    """Return the claims of a token signed with one of JWT_KEYS, or raise a 401."""
+    claims = verified_tokens.get(token)
+    if claims is not None:
+        return claims
+    try:
+        key = JWT_KEYS[jwt.get_unverified_header(token)["kid"]]
+        claims = jwt.decode(token, key, algorithms=["HS256"])
+    except (jwt.InvalidTokenError, KeyError):
+        raise HTTPException(status_code=401, detail='Invalid token', headers={"WWW-Authenticate": "Bearer"})
+    verified_tokens.put(token, claims)
+    return claims
+
+
+def get_token_claims(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Optional[dict]:
+    """Dependency for protected endpoints: the caller's token claims.
+
+    A token that is sent must be valid; a missing one is only rejected
+    when PRUVE_REQUIRE_AUTH is on, and yields None otherwise.
+    """
+    if credentials is None:
+        if REQUIRE_AUTH:
+            raise HTTPException(status_code=401, detail='Not authenticated', headers={"WWW-Authenticate": "Bearer"})
+        return None
+    return verify_access_token(credentials.credentials)
+
+
+def require_admin(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    """Dependency for admin endpoints: the bearer token must be PRUVE_ADMIN_KEY.
+
+    User tokens are never enough, and the check does not depend on
+    PRUVE_REQUIRE_AUTH.
+    """
+    if not ADMIN_KEY:
+        raise HTTPException(status_code=403, detail='Admin endpoints are disabled')
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode(), ADMIN_KEY.encode()):
+        raise HTTPException(status_code=401, detail='Admin key required', headers={"WWW-Authenticate": "Bearer"})
+
+
+class QueryCache(TTLCache):
+    """Thread-safe LRU cache of query results with a TTL and table tags.
+
+    Decorate a loader with ``@query_cache.cached("table", ...)`` to cache its
+    result per argument tuple. ``invalidate("table")`` drops every entry
+    tagged with that table; a load that was already running when the table
+    was invalidated still returns its rows but does not store them.
+    Cached values are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256):
+        super().__init__(ttl, max_entries)  # entries hold (tables, value)
+        self._generations = Counter()  # table -> number of invalidations so far
+        self._invalidations = 0
+
+    def cached(self, *tables: str, tags=None):
+        """Cache ``func`` under ``tables``, or under ``tags(*args)`` when the tables depend on the arguments."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                key = (func.__qualname__,) + args
+                with self._lock:
+                    found, entry = self._lookup(key)
+                if found:
+                    return entry[1]
+                entry_tables = tuple(tags(*args)) if tags else tables
+                generations = self._generation(entry_tables)
+                value = func(*args)
+                self._put(key, entry_tables, generations, value)
+                return value
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tables: str):
+        """Drop the entries tagged with ``tables``, or everything if none are given."""
+        with self._lock:
+            if not tables:
+                tables = tuple({table for _, (entry_tables, _) in self._entries.values() for table in entry_tables})
+                self._entries.clear()
+            else:
+                for key in [key for key, (_, (entry_tables, _)) in self._entries.items()
+                            if not entry_tables.isdisjoint(tables)]:
+                    del self._entries[key]
+            for table in tables:
+                self._generations[table] += 1
+            self._invalidations += 1
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["invalidations"] = self._invalidations
+        return stats
+
+    def _generation(self, tables):
+        with self._lock:
+            return tuple(self._generations[table] for table in tables)
+
+    def _put(self, key, tables, generations, value):
+        with self._lock:
+            if tuple(self._generations[table] for table in tables) != generations:
+                return  # invalidated while loading; the value may predate the write
+            self._store(key, (frozenset(tables), value))
+
+
+query_cache = QueryCache(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES)
+
+
+class CacheInvalidateRequest(BaseModel):
+    tables: List[str] = []
+
+
+@app.get("/pruve/cache/stats")
+def get_cache_stats():
+    return {"query_cache": query_cache.stats(), "user_profiles": user_profile_cache.stats(),
+            "verified_tokens": verified_tokens.stats(), "voted_matches": voted_matches.stats(),
+            "resource_versions": resource_versions.stats()}
+
+
+class ResourceVersions:
+    """Thread-safe change stamps for the resources behind the read endpoints.
+
+    A stamp is the database clock, in microseconds, at the last write to a
+    resource. Writers store it in resource_version_pruve in their own
+    transaction and ``bump`` it here after committing; the tally listener
+    replays the stamps announced by every worker. ``bump()`` with no
+    resources moves every stamp. Each worker ``load``s the table at startup
+    and whenever its listener reconnects, so all workers build the same
+    ETag for the same state.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._stamps = {}  # resource -> latest stamp
+        self._everything = 0  # latest stamp of a bump that named no resources
+
+        self._bumps = 0
+
+    def bump(self, *resources: str, at: int):
+        with self._lock:
+            if not resources:
+                self._everything = max(self._everything, at)
+            for resource in resources:
+                if at > self._stamps.get(resource, 0):
+                    self._stamps[resource] = at
+            self._bumps += 1
+
+    def load(self, rows) -> Optional[List[str]]:
+        """Apply stored ``(resource, stamp)`` rows and return the resources that moved.
+
+        Returns None when the everything stamp moved.
+        """
+        moved = []
+        with self._lock:
+            for resource, stamp in rows:
+                if resource == ALL_RESOURCES:
+                    if stamp > self._everything:
+                        self._everything = stamp
+                        moved = None
+                elif stamp > self._stamps.get(resource, 0):
+                    self._stamps[resource] = stamp
+                    if moved is not None:
+                        moved.append(resource)
+        return moved
+
+    def etag(self, *resources: str) -> Optional[str]:
+        """Weak ETag for the current state of ``resources``, or None when ETags are disabled."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            stamps = [max(self._stamps.get(resource, 0), self._everything) for resource in resources]
+        return 'W/"%s"' % "-".join(format(stamp, "x") for stamp in stamps)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"resources": len(self._stamps), "enabled": self.enabled, "bumps": self._bumps}
+
+
+resource_versions = ResourceVersions(enabled=ETAGS)
+
+# Stamps come from the database so that workers on hosts with skewed clocks still agree
+CHANGE_STAMP_SQL = "(extract(epoch FROM clock_timestamp()) * 1000000)::bigint"
+
+# Row of resource_version_pruve written by a change to every resource
+ALL_RESOURCES = "*"
+
+# A resource's stamp is the largest over its slots. Each session writes the slot
+# picked by its backend pid, so concurrent votes do not queue on one row lock.
+RESOURCE_VERSION_SLOTS = 64
+
+RESOURCE_VERSIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS resource_version_pruve (
+        resource text NOT NULL,
+        slot smallint NOT NULL,
+        stamp bigint NOT NULL,
+        PRIMARY KEY (resource, slot)
+    );
+"""
+
+# Upserts the stamp from ``source`` for every resource in ``resources`` (a SQL expression)
+_STORE_STAMPS_SQL = """
+    INSERT INTO resource_version_pruve (resource, slot, stamp)
+    SELECT resource, pg_backend_pid() %% {slots}, stamp FROM {resources} AS resource, {source}
+    ON CONFLICT (resource, slot) DO UPDATE SET stamp = GREATEST(resource_version_pruve.stamp, EXCLUDED.stamp)
+"""
+
+
+def store_stamps_sql(resources: str, source: str) -> str:
+    return _STORE_STAMPS_SQL.format(slots=RESOURCE_VERSION_SLOTS, resources=resources, source=source)
+
+
+def announce_change(cur, resources: List[str], payload: Optional[dict] = None) -> int:
+    """Store a new stamp for ``resources`` and queue a NOTIFY, both part of the caller's transaction.
+
+    No resources means all of them. Every worker's tally listener picks up
+    the NOTIFY (``payload`` is merged in for the live tally push) to move its
+    stamps and drop its cached queries for those resources. Returns the
+    stamp, for the caller to ``bump`` its own stamps with once it has
+    committed.
+    """
+    cur.execute("WITH now AS (SELECT " + CHANGE_STAMP_SQL + " AS stamp), stored AS ("
+                + store_stamps_sql("unnest(%(resources)s::text[])", "now") + ")"
+                " SELECT stamp, pg_notify(%(channel)s, (%(payload)s::jsonb || jsonb_build_object("
+                "'resources', %(announced)s::text[], 'at', stamp))::text) FROM now",
+                {"channel": TALLY_CHANNEL, "payload": json.dumps(payload or {}), "announced": list(resources),
+                 "resources": list(resources) or [ALL_RESOURCES]})
+    return cur.fetchone()[0]
+
+
+def load_resource_versions(cur) -> Optional[List[str]]:
+    cur.execute("SELECT resource, max(stamp) FROM resource_version_pruve GROUP BY resource")
+    return resource_versions.load(cur.fetchall())
+
+
+@app.on_event("startup")
+def seed_resource_versions():
+    apply_schema(RESOURCE_VERSIONS_DDL)
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        load_resource_versions(cur)
+
+
+# Cache-Control per read endpoint. The feed tables are only written outside the API
+# and already served from a QUERY_CACHE_TTL cache, so clients may keep them as long.
+# Match cards carry vote counts, so they, the merged feed and comment threads are
+# revalidated on every use, which is a bodiless 304 while nothing has changed. The
+# poll feed holds the caller's own votes and must not sit in shared caches.
+CACHE_CONTROL = {
+    "conversations": "public, max-age=%d" % QUERY_CACHE_TTL,
+    "wildcards": "public, max-age=%d" % QUERY_CACHE_TTL,
+    "matchschedule": "public, no-cache",
+    "feed": "public, no-cache",
+    "comments": "public, no-cache",
+    "polls": "private, no-cache",
+}
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def conditional_get(request: Request, cache_control: str, *resources: str):
+    """Headers for a read of ``resources``, and a 304 to return instead when the client is up to date.
+
+    Call it before running any query: with the ETag taken first, a write
+    that lands while the data is read makes the next request miss rather
+    than hide the write behind a 304.
+    """
+    headers = {"Cache-Control": cache_control}
+    etag = resource_versions.etag(*resources)
+    if etag is None:
+        return headers, None
+    headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and (if_none_match.strip() == "*" or _opaque_tag(etag) in
+                                      {_opaque_tag(tag.strip()) for tag in if_none_match.split(",")}):
+        return headers, Response(status_code=304, headers=headers)
+    return headers, None
+
+
+# For writes made outside this API, e.g. the match schedule being edited directly.
+# Every worker drops those tables and moves their ETags.
+@app.post("/pruve/cache/invalidate", dependencies=[Depends(require_admin)])
+def invalidate_cache(invalidate_request: CacheInvalidateRequest):
+    query_cache.invalidate(*invalidate_request.tables)
+    try:
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            stamp = announce_change(cur, invalidate_request.tables)
+            conn.commit()
+    except psycopg2.Error as e:
+        print("Error message:", str(e))
+        raise HTTPException(status_code=500, detail='Failed to announce the invalidation')
+    resource_versions.bump(*invalidate_request.tables, at=stamp)
+    return {"invalidated": invalidate_request.tables or "all"}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError("Object of type %s is not JSON serializable" % type(value).__name__)
+
+
+def encode_json(content) -> bytes:
+    start = time.perf_counter()
+    try:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, default=_json_default, separators=(",", ":")).encode()
+    finally:
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.add_serialization(time.perf_counter() - start)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for lists built straight from database rows.
+
+    Returning it from an endpoint skips FastAPI's response_model validation
+    and jsonable_encoder pass, so only use it for dicts already shaped like
+    the declared model; the route's response_model still documents them.
+    Datetimes are written in ISO 8601, as pydantic does.
+    """
+
+    def render(self, content) -> bytes:
+        return encode_json(content)
 
 
 # User Model
 class User(BaseModel):
-    uid: Optional[int]
+    uid: Optional[int] = None
     email: str
     name: str
     picture: str
 
 
 class AuthResponse(BaseModel):
-    uid: Optional[int]
+    uid: Optional[int] = None
     access_token: str
     token_type: str
     email: str
@@ -52,7 +1032,7 @@ class Vote(BaseModel):
 class Option(BaseModel):
     option_id: Optional[int] = None
     option_text: str
-    vote_count: Optional[int]
+    vote_count: Optional[int] = None
 
 
 
@@ -64,22 +1044,26 @@ class Poll(BaseModel):
     options: List[Option]
     answer: str
 
+
+class PollBulkCreateRequest(BaseModel):
+    polls: List[Poll]
+
 class PollVote(BaseModel):
     poll_id: int
     type: str
     user_id: int
     question: str
-    answer_id: Optional[int]
+    answer_id: Optional[int] = None
     created_at: datetime
     creator: str
-    author_selected_option_id: Optional[int]
+    author_selected_option_id: Optional[int] = None
     options: List[Option]
     # vote_count: int
-    user_selected: Optional[int]
-    voters: List[str]
+    user_selected: Optional[int] = None
+    voters: List[str]  # the first VOTER_PREVIEW_SIZE voters; total_vote_count counts them all
     predictionAccuracy: int
     picture: str
-    total_vote_count: Optional[int]
+    total_vote_count: Optional[int] = None
 
 
 class LeagueCreateRequest(BaseModel):
@@ -91,71 +1075,237 @@ class LeagueCreateRequest(BaseModel):
     is_public: bool
 
 
+class LeagueMembersAddRequest(BaseModel):
+    users: list[int]
+
+
+class UserImportRequest(BaseModel):
+    users: List[User]
+
+
+def _trigrams(text: str) -> set:
+    text = "  " + text.lower() + " "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class UserSearchIndex:
+    """In-memory trigram index over user names for /pruve/users/search/.
+
+    Candidates are the users sharing the most trigrams with the query; only
+    those are scored with ``fuzz.ratio``, so a search never walks every user.
+    Posting lists are counted rarest first and counting stops once
+    ``max_postings`` entries have been read, which bounds the cost of a query
+    made only of very common trigrams.
+    New users are added by ``save_user_to_db``, and ``refresh`` picks up rows
+    inserted by other workers by reading past the highest uid seen so far.
+    """
+
+    def __init__(self, max_candidates: int = 200, max_postings: int = 50000,
+                 refresh_interval: float = 5.0, refresh_overlap: int = 100):
+        self.max_candidates = max_candidates
+        self.max_postings = max_postings
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = refresh_overlap
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()  # held by the one thread reading users_pruve
+        self._users = {}  # uid -> (name, picture)
+        self._postings = {}  # trigram -> [uid, ...]
+        self._max_uid = 0
+        self._refreshed_at = None
+
+    def __len__(self):
+        return len(self._users)
+
+    def add(self, uid: int, name: str, picture: str):
+        with self._lock:
+            self._add(uid, name, picture)
+
+    def needs_refresh(self) -> bool:
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def refresh(self, pool: ConnectionPool) -> bool:
+        """Load users with a uid above the highest one read by the last refresh.
+
+        One thread refreshes at a time. Once the index has been built the
+        others return False straight away and keep searching it as it is;
+        before that they wait for the first build instead of each reading
+        the whole table.
+        """
+        if not self._refreshing.acquire(blocking=self._refreshed_at is None):
+            return False
+        try:
+            if not self.needs_refresh():
+                return False  # done by the thread we waited for
+            # Serial values can commit out of order, so re-read a small window
+            # below the watermark; users already indexed are skipped.
+            with pool.connection() as conn, conn.cursor() as cur:
+                cur.execute("SELECT uid, name, picture FROM users_pruve WHERE uid > %s ORDER BY uid",
+                            (self._max_uid - self.refresh_overlap,))
+                rows = cur.fetchall()
+            with self._lock:
+                for uid, name, picture in rows:
+                    self._add(uid, name, picture)
+                if rows:
+                    self._max_uid = max(self._max_uid, rows[-1][0])
+                self._refreshed_at = time.monotonic()
+            return True
+        finally:
+            self._refreshing.release()
+
+    def search(self, query: str, limit: int = 5, min_score: float = 50) -> list:
+        with self._lock:
+            postings = sorted((self._postings[g] for g in _trigrams(query) if g in self._postings), key=len)
+            hits = Counter()
+            read = 0
+            for posting in postings:
+                if read and read + len(posting) > self.max_postings:
+                    break
+                hits.update(posting)
+                read += len(posting)
+            candidates = [(uid,) + self._users[uid] for uid, _ in hits.most_common(self.max_candidates)]
+
+        scored = []
+        for uid, name, picture in candidates:
+            score = fuzz.ratio(query, name)
+            if score > min_score:
+                scored.append((score, uid, name, picture))
+        scored.sort(key=lambda match: match[0], reverse=True)
+        return [{"uid": uid, "user_name": name, "picture": picture} for _, uid, name, picture in scored[:limit]]
+
+    def _add(self, uid, name, picture):
+        if uid in self._users:
+            return
+        self._users[uid] = (name, picture)
+        for gram in _trigrams(name):
+            self._postings.setdefault(gram, []).append(uid)
+
+
+user_search_index = UserSearchIndex(refresh_interval=USER_SEARCH_REFRESH_INTERVAL)
+
+
+class UserProfileCache(TTLCache):
+    """Thread-safe LRU cache of ``uid -> {"uid", "email", "name", "picture"}`` with a TTL.
+
+    ``get_many`` serves what it can from memory and loads the rest with one
+    query on the caller's cursor. Unknown uids are left out of the result
+    and not cached, so a user created later is found on the next lookup.
+    Returned profiles are shared and must not be mutated.
+    """
+
+    def get_many(self, cur, uids) -> Dict[int, dict]:
+        found, missing = {}, []
+        with self._lock:
+            for uid in set(uids):
+                hit, profile = self._lookup(uid)
+                if hit:
+                    found[uid] = profile
+                else:
+                    missing.append(uid)
+
+        if missing:
+            cur.execute("SELECT uid, email, name, picture FROM users_pruve WHERE uid = ANY(%s)", (missing,))
+            for uid, email, name, picture in cur.fetchall():
+                found[uid] = self.put(uid, email, name, picture)
+        return found
+
+    def put(self, uid: int, email: str, name: str, picture: str) -> dict:
+        profile = {"uid": uid, "email": email, "name": name, "picture": picture}
+        with self._lock:
+            self._store(uid, profile)
+        return profile
+
+    def invalidate(self, *uids: int):
+        with self._lock:
+            for uid in uids:
+                self._entries.pop(uid, None)
+
+
+user_profile_cache = UserProfileCache(ttl=USER_PROFILE_CACHE_TTL, max_entries=USER_PROFILE_CACHE_MAX_ENTRIES)
+
+
+@app.on_event("startup")
+def build_user_search_index():
+    # Read users_pruve once in the background so the first searches find a built index
+    threading.Thread(target=user_search_index.refresh, args=(db_pool,), name="pruve-user-search-build",
+                     daemon=True).start()
+
+
 @app.get("/pruve/users/search/")
 def search_users(user_name: str):
-    # Create a cursor
-    cur = conn.cursor()
+    # Pick up users created since the last search, then query the index
+    if user_search_index.needs_refresh():
+        user_search_index.refresh(db_pool)
 
-    # Perform the necessary database query to search for user names
-    cur.execute("SELECT uid, name, picture FROM users_pruve")
-    users = cur.fetchall()
+    # Prepare the response JSON
+    response = {"user_name": user_name, "matches": user_search_index.search(user_name)}
 
-    # Perform fuzzy string matching
-    matches = []
-    for user in users:
-        db_uid, db_user_name, db_user_picture = user
-        if fuzz.ratio(user_name, db_user_name) > 50:
-            matches.append({
-                "uid": db_uid,
-                "user_name": db_user_name,
-                "picture": db_user_picture
-            })
+    return response
 
-    # Prepare the response JSON
-    response = {"user_name": user_name, "matches": matches[:5]}
 
-    # Close the cursor
-    cur.close()
+def load_league_rosters(cur, league_ids: List[int], member_limit: Optional[int] = None) -> Dict[int, dict]:
+    """Load the members of every league in ``league_ids`` in one query.
 
-    return response
+    Returns ``{league_id: {"member_count": int, "members": [(uid, name, picture), ...]}}``.
+    ``member_count`` is always the full roster size; ``members`` holds at most
+    ``member_limit`` users per league when a limit is given.
+    """
+    rosters = {league_id: {"member_count": 0, "members": []} for league_id in league_ids}
+    if not rosters:
+        return rosters
 
+    query = """
+        SELECT league_id, member_count, position, user_id
+        FROM (
+            SELECT m.league_id, m.user_id,
+                COUNT(*) OVER (PARTITION BY m.league_id) AS member_count,
+                ROW_NUMBER() OVER (PARTITION BY m.league_id ORDER BY m.user_id) AS position
+            FROM league_membership_pruve m
+            WHERE m.league_id = ANY(%s)
+        ) AS roster
+    """
+    params = [list(rosters)]
+    if member_limit is not None:
+        # Keep the first row of every league even with a zero limit, it carries the count
+        query += " WHERE position <= %s"
+        params.append(max(member_limit, 1))
+    query += " ORDER BY league_id, position"
+
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    profiles = user_profile_cache.get_many(cur, [row[3] for row in rows])
+    for league_id, member_count, position, user_id in rows:
+        roster = rosters[league_id]
+        roster["member_count"] = member_count
+        if (member_limit is None or position <= member_limit) and user_id in profiles:
+            profile = profiles[user_id]
+            roster["members"].append((user_id, profile["name"], profile["picture"]))
+    return rosters
 
-@app.get("/pruve/leagues/{user_id}")
-def get_user_leagues(user_id: int):
-    # Perform the necessary database query to retrieve user's leagues and corresponding usernames
-    cur.execute("SELECT l.league_name, l.league_description, u.name, u.picture "
-                "FROM league_pruve l "
-                "JOIN league_membership_pruve m ON l.league_id = m.league_id "
-                "JOIN users_pruve u ON m.user_id = u.uid "
-                "WHERE m.user_id = %s", (user_id,))
-    leagues = cur.fetchall()
-
-    # Group the results by league
-    league_data = {}
-    for league, description, user, image in leagues:
-        if league in league_data:
-            league_data[league]["users"].append({"user_name": user, "image": image})
-        else:
-            league_data[league] = {"league_description": description, "users": [{"user_name": user, "image": image}]}
 
-    # Add all users in each league
-    for league, data in league_data.items():
-        cur.execute("SELECT u.name, u.picture "
+@app.get("/pruve/leagues/{user_id}")
+def get_user_leagues(user_id: int, member_limit: Optional[int] = None):
+    # Retrieve the user's leagues, then every league's roster in a single batch
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT l.league_id, l.league_name, l.league_description "
                     "FROM league_pruve l "
                     "JOIN league_membership_pruve m ON l.league_id = m.league_id "
-                    "JOIN users_pruve u ON m.user_id = u.uid "
-                    "WHERE l.league_name = %s", (league,))
-        users = cur.fetchall()
-
-        # Add the users to the league data
-        for user, image in users:
-            data["users"].append({"user_name": user, "image": image})
+                    "WHERE m.user_id = %s "
+                    "ORDER BY l.league_id", (user_id,))
+        leagues = cur.fetchall()
+        rosters = load_league_rosters(cur, [league[0] for league in leagues], member_limit)
 
     # Prepare the response JSON
     response = {"user_id": user_id, "leagues": []}
 
-    for league, data in league_data.items():
-        league_info = {"league_name": league, "league_description": data["league_description"], "users": data["users"]}
+    for league_id, league, description in leagues:
+        roster = rosters[league_id]
+        league_info = {
+            "league_id": league_id,
+            "league_name": league,
+            "league_description": description,
+            "member_count": roster["member_count"],
+            "users": [{"user_name": name, "image": picture} for _, name, picture in roster["members"]]
+        }
         response["leagues"].append(league_info)
 
     return response
@@ -164,61 +1314,55 @@ def get_user_leagues(user_id: int):
 
 
 @app.get("/pruve/leagues/not_member/{user_id}")
-def get_non_member_leagues(user_id: int):
-    # Create a cursor
-    cur = conn.cursor()
+def get_non_member_leagues(user_id: int, cursor: Optional[int] = None, limit: int = 20, member_limit: int = 5):
+    limit = max(1, min(limit, 100))
 
-    # Retrieve the leagues that the user is not a member of
+    # Retrieve one page of public leagues the user is not a member of, newest
+    # first; `cursor` is the last league_id of the previous page
     query = """
         SELECT l.league_id, l.league_name, l.league_description
         FROM league_pruve l
-        WHERE l.league_id NOT IN (
-            SELECT m.league_id
-            FROM league_membership_pruve m
-            WHERE m.user_id = %s
-        )
+        WHERE l.is_public
+            AND NOT EXISTS (
+                SELECT 1
+                FROM league_membership_pruve m
+                WHERE m.league_id = l.league_id AND m.user_id = %s
+            )
     """
-    cur.execute(query, (user_id,))
-    leagues = cur.fetchall()
+    params = [user_id]
+    if cursor is not None:
+        query += " AND l.league_id < %s"
+        params.append(cursor)
+    query += " ORDER BY l.league_id DESC LIMIT %s"
+    params.append(limit + 1)
+
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(query, params)
+        leagues = cur.fetchall()
+        has_more = len(leagues) > limit
+        leagues = leagues[:limit]
+
+        # Retrieve a preview of the members of every league on the page at once
+        rosters = load_league_rosters(cur, [league[0] for league in leagues], member_limit)
 
-    # Create a dictionary to store the league data
     league_data = []
-
-    # Iterate over the leagues and fetch additional information
-    for league in leagues:
-        league_id, league_name, league_description = league
-
-        # Retrieve other users who are part of the league
-        cur.execute("""
-            SELECT u.uid, u.name, u.picture
-            FROM users_pruve u
-            JOIN league_membership_pruve m ON u.uid = m.user_id
-            WHERE m.league_id = %s
-        """, (league_id,))
-        users = cur.fetchall()
-
-        # Extract the user information
-        user_info = []
-        for user in users:
-            user_id, user_name, user_picture = user
-            user_info.append({"user_id": user_id, "user_name": user_name, "user_picture": user_picture})
-
-        # Add the league data to the dictionary
+    for league_id, league_name, league_description in leagues:
+        roster = rosters[league_id]
         league_data.append({
             "league_id": league_id,
             "league_name": league_name,
             "league_description": league_description,
-            "users": user_info
+            "member_count": roster["member_count"],
+            "users": [{"user_id": uid, "user_name": name, "user_picture": picture}
+                      for uid, name, picture in roster["members"]]
         })
 
-    # Close the cursor
-    cur.close()
-
-    return {"user_id": user_id, "non_member_leagues": league_data}
+    next_cursor = leagues[-1][0] if has_more else None
+    return {"user_id": user_id, "non_member_leagues": league_data, "next_cursor": next_cursor}
 
 
 
-@app.post("/pruve/leagues")
+@app.post("/pruve/leagues", dependencies=[Depends(get_token_claims)])
 def create_league(league_request: LeagueCreateRequest):
     # Extract the data from the request
     name = league_request.name
@@ -231,62 +1375,213 @@ def create_league(league_request: LeagueCreateRequest):
     # Check if creator_id is not already in the users list, add it
     if creator_id not in users:
         users.append(creator_id)
+    users = list(dict.fromkeys(users))
 
     # Perform the necessary operations to create the league
     # Insert the league details into the database
-    cur.execute("INSERT INTO league_pruve (league_name, league_description, type, is_public, creator_id) "
-                "VALUES (%s, %s, 'league', %s, %s) RETURNING league_id",
-                (name, description, is_public, creator_id))
-    league_id = cur.fetchone()[0]  # Retrieve the generated league_id
-
-    # Insert the league membership details into the database
-    for user_id in users:
-        if user_id == creator_id:
-            role = "admin"
-        else:
-            role = "role player"
-        cur.execute("INSERT INTO league_membership_pruve (league_id, user_id, role) VALUES (%s, %s, %s)",
-                    (league_id, user_id, role))
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("INSERT INTO league_pruve (league_name, league_description, type, is_public, creator_id) "
+                    "VALUES (%s, %s, 'league', %s, %s) RETURNING league_id",
+                    (name, description, is_public, creator_id))
+        league_id = cur.fetchone()[0]  # Retrieve the generated league_id
+
+        # Insert all league memberships in one statement, the creator as admin
+        cur.execute("INSERT INTO league_membership_pruve (league_id, user_id, role) "
+                    "SELECT %s, u.user_id, CASE WHEN u.user_id = %s THEN 'admin' ELSE 'role player' END "
+                    "FROM unnest(%s::int[]) AS u(user_id)",
+                    (league_id, creator_id, users))
+
+        # Insert the matchup details into the league_matchup_pruve table
+        if matchup_id:
+            cur.execute("INSERT INTO league_matchup_pruve (league_id, matchup_schedule_id) "
+                        "SELECT %s, m.matchup_schedule_id FROM unnest(%s::int[]) AS m(matchup_schedule_id)",
+                        (league_id, matchup_id))
+
+        # Commit the changes to the database
+        conn.commit()
 
-    # Insert the matchup details into the league_matchup_pruve table
-    for matchup_schedule_id in matchup_id:
-        cur.execute("INSERT INTO league_matchup_pruve (league_id, matchup_schedule_id) VALUES (%s, %s)",
-                    (league_id, matchup_schedule_id))
+    return {"message": "League created successfully", "league_id": league_id}
 
-    # Commit the changes to the database
-    conn.commit()
 
-    return {"message": "League created successfully"}
+@app.post("/pruve/leagues/{league_id}/members", dependencies=[Depends(get_token_claims)])
+def add_league_members(league_id: int, members_request: LeagueMembersAddRequest):
+    # Existing users who are not in the league yet are added in a single
+    # statement, however long the list is
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM league_pruve WHERE league_id = %s", (league_id,))
+        if cur.fetchone() is None:
+            raise HTTPException(status_code=404, detail='League not found')
+
+        cur.execute("""
+            INSERT INTO league_membership_pruve (league_id, user_id, role)
+            SELECT %s, u.uid, 'role player'
+            FROM users_pruve u
+            WHERE u.uid = ANY(%s)
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM league_membership_pruve m
+                    WHERE m.league_id = %s AND m.user_id = u.uid
+                )
+        """, (league_id, list(set(members_request.users)), league_id))
+        added = cur.rowcount
+
+        conn.commit()
+
+    return {"league_id": league_id, "added": added}
+
+
+# The tables and indexes below are created at startup. Every worker runs
+# the DDL, so an advisory lock lets one through at a time: concurrent
+# IF NOT EXISTS creates can still collide in the catalogs. Indexes are
+# built CONCURRENTLY so that a first build does not block writes.
+SCHEMA_LOCK_ID = 0x70727576
+SCHEMA_INDEX_NAME = re.compile(r"CREATE (?:UNIQUE )?INDEX CONCURRENTLY IF NOT EXISTS (\w+)")
+
+
+@contextmanager
+def schema_session():
+    """Yield an autocommit cursor while holding the schema lock."""
+    with db_pool.connection() as conn:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                # Poll instead of waiting in pg_advisory_lock: a waiting
+                # session holds a snapshot that an index build would wait for
+                cur.execute("SELECT pg_try_advisory_lock(%s)", (SCHEMA_LOCK_ID,))
+                while not cur.fetchone()[0]:
+                    time.sleep(0.5)
+                    cur.execute("SELECT pg_try_advisory_lock(%s)", (SCHEMA_LOCK_ID,))
+                try:
+                    yield cur
+                finally:
+                    cur.execute("SELECT pg_advisory_unlock(%s)", (SCHEMA_LOCK_ID,))
+        finally:
+            if not conn.closed:
+                conn.autocommit = False
+
+
+def run_schema(cur, ddl: str):
+    """Run ``ddl`` one statement at a time on a cursor from schema_session().
+
+    A CONCURRENTLY build that failed or was interrupted leaves an invalid
+    index behind, which IF NOT EXISTS would then skip; such an index is
+    dropped and built again.
+    """
+    for statement in filter(None, (statement.strip() for statement in ddl.split(";"))):
+        index = SCHEMA_INDEX_NAME.match(statement)
+        if index:
+            cur.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (index.group(1),))
+            row = cur.fetchone()
+            if row is not None and not row[0]:
+                cur.execute("DROP INDEX CONCURRENTLY %s" % index.group(1))
+        cur.execute(statement)
+
+
+def apply_schema(ddl: str):
+    """Run ``ddl`` outside a transaction, holding the schema lock."""
+    with schema_session() as cur:
+        run_schema(cur, ddl)
+
+
+USER_INDEXES_DDL = """
+    CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS users_pruve_email_key ON users_pruve (email);
+"""
+
+
+@app.on_event("startup")
+def ensure_user_indexes():
+    # Fails if users_pruve already holds duplicate emails; those have to be
+    # merged by hand before the upsert below can rely on the constraint
+    apply_schema(USER_INDEXES_DDL)
+
+
+# Save User to DB Function (blocking, call through run_db)
+# Returns (uid, inserted). An existing user is read back without writing to its
+# row; name and picture are left as they were.
+SAVE_USER_STATEMENT = """
+    WITH ins AS (
+        INSERT INTO users_pruve (email, name, picture) VALUES (%(email)s, %(name)s, %(picture)s)
+        ON CONFLICT (email) DO NOTHING
+        RETURNING uid
+    )
+    SELECT uid, true FROM ins
+    UNION ALL
+    SELECT uid, false FROM users_pruve WHERE email = %(email)s
+    LIMIT 1
+"""
 
 
-# Save User to DB Function
 def save_user_to_db(user: User) -> int:
+    # One round trip whether the user is new or not, and two devices logging
+    # in at once both get the same uid
     try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT uid FROM users_pruve WHERE email = %s", (user.email,))
-            result = cur.fetchone()
-            if result is not None:
-                uid = result[0]
-                return uid
-
-            cur.execute("INSERT INTO users_pruve (email, name, picture) VALUES (%s, %s, %s) RETURNING uid",
-                        (user.email, user.name, user.picture))
-            uid = cur.fetchone()[0]
+        with async_db_pool.connection() as conn, conn.cursor() as cur:
+            params = {"email": user.email, "name": user.name, "picture": user.picture}
+            cur.execute(SAVE_USER_STATEMENT, params)
+            row = cur.fetchone()
+            if row is None:
+                # The row came from a concurrent login that committed after
+                # this statement's snapshot was taken; it is visible now
+                cur.execute(SAVE_USER_STATEMENT, params)
+                row = cur.fetchone()
+            uid, inserted = row
             conn.commit()
 
-            return uid
+        if inserted:
+            user_profile_cache.invalidate(uid)
+            user_search_index.add(uid, user.name, user.picture)
+        return uid
     except Exception as e:
         print("Error saving user to DB:", str(e))
         raise
 
 
+USER_IMPORT_MAX_USERS = 10000
+
+
+@app.post("/pruve/users/import", dependencies=[Depends(require_admin)])
+def import_users(import_request: UserImportRequest):
+    # Users are streamed into a temporary table with COPY and moved over in
+    # one INSERT, so thousands of rows cost a few round trips. Emails that
+    # already exist, or repeat within the batch, are skipped.
+    if len(import_request.users) > USER_IMPORT_MAX_USERS:
+        raise HTTPException(status_code=400, detail='At most %d users per request' % USER_IMPORT_MAX_USERS)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)  # quoted, so empty strings stay '' rather than NULL
+    for user in import_request.users:
+        writer.writerow((user.email, user.name, user.picture))
+    buffer.seek(0)
+
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE users_import_pruve (email text, name text, picture text) ON COMMIT DROP")
+        cur.copy_expert("COPY users_import_pruve (email, name, picture) FROM STDIN WITH (FORMAT csv)", buffer)
+        cur.execute("""
+            INSERT INTO users_pruve (email, name, picture)
+            SELECT DISTINCT ON (email) email, name, picture
+            FROM users_import_pruve
+            ORDER BY email
+            ON CONFLICT (email) DO NOTHING
+            RETURNING uid, name, picture
+        """)
+        created = cur.fetchall()
+        conn.commit()
+
+    user_profile_cache.invalidate(*[uid for uid, _, _ in created])
+    for uid, name, picture in created:
+        user_search_index.add(uid, name, picture)
+
+    received = len(import_request.users)
+    return {"received": received, "created": len(created), "skipped": received - len(created)}
+
 
 # Create Access Token Function
 def create_access_token(user_email: str) -> str:
+    issued_at = int(time.time())
     access_token = jwt.encode(
-        {"sub": user_email},
-        JWT_SECRET_KEY,
-        algorithm="HS256"
+        {"sub": user_email, "iat": issued_at, "exp": issued_at + JWT_TOKEN_TTL},
+        JWT_KEYS[JWT_ACTIVE_KID],
+        algorithm="HS256",
+        headers={"kid": JWT_ACTIVE_KID}
     )
     return access_token
 
@@ -322,101 +1617,217 @@ class wildcardModel(BaseModel):
     question: str
     options: List
 
+# Feed items carry this many voters; the rest are paged from /pruve/polls/{poll_id}/voters
+VOTER_PREVIEW_SIZE = 5
+
+# Rows are turned into plain dicts shaped like the models above and sent with
+# FastJSONResponse; building and re-validating a model per row cost more than
+# the query on long lists.
+def conversation_from_row(row) -> dict:
+    return {
+        "id": row[0],
+        "type": row[1],
+        "user": row[2],
+        "time": row[3],
+        "teams": row[4],
+        "predictionText": row[5],
+        "commentCount": row[6],
+        "reactions": row[7],
+        "link": row[8]
+    }
+
+def wildcard_from_row(row) -> dict:
+    return {
+        "id": row[0],
+        "type": row[1],
+        "user": row[2],
+        "time": row[3],
+        "totalvotes": row[4],
+        "voterlist": row[5][:VOTER_PREVIEW_SIZE],
+        "question": row[6],
+        "options": row[7]
+    }
+
+def matchschedule_from_row(row) -> dict:
+    return {
+        "team1": row[1],
+        "team2": row[2],
+        "time": row[3],
+        "votecount1": row[4],
+        "votecount2": row[5],
+        "venue": row[6],
+        "image1": row[7],
+        "image2": row[8],
+        "type": row[9]
+    }
+
 # Retrieve Conversations from DB Function
-def get_conversations_from_db() -> List[ConversationModel]:
-    conversations = []
-    with conn.cursor() as cur:
+@query_cache.cached("conversation_tablev1")
+def get_conversations_from_db() -> List[dict]:
+    with async_db_pool.connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM conversation_tablev1")
         rows = cur.fetchall()
-        for row in rows:
-            conversation = ConversationModel(
-                id=row[0],
-                type=row[1],
-                user=row[2],
-                time=row[3],
-                teams=row[4],
-                predictionText=row[5],
-                commentCount=row[6],
-                reactions=row[7],
-                link = row[8]
-            )
-            conversations.append(conversation)
-    return conversations
+    return [conversation_from_row(row) for row in rows]
 
 # Retrieve wildcrad from DB Function
-def get_wildcards_from_db() -> List[wildcardModel]:
-    wildcards = []
-    with conn.cursor() as cur:
+@query_cache.cached("wildcard_tablev1")
+def get_wildcards_from_db() -> List[dict]:
+    with async_db_pool.connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM wildcard_tablev1")
         rows = cur.fetchall()
-        for row in rows:
-            wildcard = wildcardModel(
-                id=row[0],
-                type=row[1],
-                user=row[2],
-                time=row[3],
-                totalvotes=row[4],
-                voterlist=row[5],
-                question=row[6],
-                options=row[7]
-            )
-            wildcards.append(wildcard)
-    return wildcards
+    return [wildcard_from_row(row) for row in rows]
 
-def get_matchcard_from_db() -> List[Matchschedule]:
-    matchschedules = []
-    with conn.cursor() as cur:
+@query_cache.cached("matchschedulev2")
+def get_matchcard_from_db() -> List[dict]:
+    with async_db_pool.connection() as conn, conn.cursor() as cur:
         cur.execute("SELECT * FROM matchschedulev2")
         rows = cur.fetchall()
-        for row in rows:
-            matchschedule = Matchschedule(
-                team1=row[1],
-                team2=row[2],
-                time=row[3],
-                votecount1=row[4],
-                votecount2=row[5],
-                venue=row[6],
-                image1 = row[7],
-                image2= row[8],
-                type=row[9]
-            )
-            matchschedules.append(matchschedule)
-    return matchschedules
+    return [matchschedule_from_row(row) for row in rows]
+
+
+# Sources merged into /pruve/data: name -> (table, sort expression, row converter).
+# Every table has `id` and `time` as its first and fourth columns; match
+# schedules without a time sort last.
+FEED_SOURCES = {
+    "conversations": ("conversation_tablev1", "time", conversation_from_row),
+    "matchschedules": ("matchschedulev2", "COALESCE(time, '0001-01-01')", matchschedule_from_row),
+    "wildcards": ("wildcard_tablev1", "time", wildcard_from_row),
+}
+FEED_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 100
+
+
+def _feed_sort_time(value: Optional[datetime]) -> datetime:
+    # Compare naive and aware timestamps from different tables on one scale
+    if value is None:
+        return datetime.min
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_feed_cursor(positions: Dict[str, list]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(positions).encode()).decode()
+
+
+def decode_feed_cursor(cursor: Optional[str]) -> Dict[str, tuple]:
+    """Turn an opaque cursor back into ``{source: (time, id)}`` positions."""
+    if not cursor:
+        return {}
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(positions, dict):
+            raise TypeError("cursor must decode to an object")
+        return {
+            source: (datetime.fromisoformat(time_value) if time_value else datetime.min, int(row_id))
+            for source, (time_value, row_id) in positions.items()
+            if source in FEED_SOURCES
+        }
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+
+
+@query_cache.cached(tags=lambda source, *args: (FEED_SOURCES[source][0],))
+def get_feed_source_page(source: str, after: Optional[tuple], limit: int) -> list:
+    """Read the next ``limit`` rows of one feed source, newest first.
+
+    Returns ``(sort key, position, item)`` tuples where ``position`` is what
+    the cursor stores to resume this source after that row.
+    """
+    table, sort_expression, from_row = FEED_SOURCES[source]
+    query = "SELECT * FROM %s" % table
+    params = []
+    if after is not None:
+        query += " WHERE (%s, id) < (%%s, %%s)" % sort_expression
+        params.extend(after)
+    query += " ORDER BY %s DESC, id DESC LIMIT %%s" % sort_expression
+    params.append(limit)
+
+    with async_db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(query, params)
+        rows = cur.fetchall()
+
+    page = []
+    for row in rows:
+        position = [row[3].isoformat() if row[3] is not None else None, row[0]]
+        page.append(((_feed_sort_time(row[3]), row[0]), position, from_row(row)))
+    return page
+
+
+async def get_feed_page(cursor: Optional[str], limit: int) -> dict:
+    """Merge the newest rows of every feed source into one page.
+
+    Each source is read concurrently from its own position in the cursor,
+    and the results are k-way merged by time. The next cursor moves only the
+    sources that contributed items, so nothing is skipped or repeated.
+    """
+    positions = decode_feed_cursor(cursor)
+    sources = list(FEED_SOURCES)
+    pages = await asyncio.gather(*(run_db(get_feed_source_page, source, positions.get(source), limit)
+                                   for source in sources))
+
+    merged = heapq.merge(*([(key, source, position, item) for key, position, item in page]
+                           for source, page in zip(sources, pages)),
+                         key=lambda entry: entry[0], reverse=True)
+    items = []
+    next_positions = {source: [value[0].isoformat(), value[1]] for source, value in positions.items()}
+    for _, source, position, item in itertools.islice(merged, limit):
+        items.append(item)
+        next_positions[source] = position
+
+    fetched = sum(len(page) for page in pages)
+    has_more = fetched > len(items) or any(len(page) == limit for page in pages)
+    return {"items": items, "next_cursor": encode_feed_cursor(next_positions) if has_more else None}
 
 # Get Conversations API Endpoint
 @app.get("/pruve/conversations", response_model=List[ConversationModel])
-async def get_conversations():
+async def get_conversations(request: Request):
+    headers, not_modified = conditional_get(request, CACHE_CONTROL["conversations"], "conversation_tablev1")
+    if not_modified is not None:
+        return not_modified
     try:
-        conversations = get_conversations_from_db()
-        return conversations
+        conversations = await run_db(get_conversations_from_db)
+        return FastJSONResponse(conversations, headers=headers)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 # Get Conversations API Endpoint
 @app.get("/pruve/wildcards", response_model=List[wildcardModel])
-async def get_wildcards():
+async def get_wildcards(request: Request):
+    headers, not_modified = conditional_get(request, CACHE_CONTROL["wildcards"], "wildcard_tablev1")
+    if not_modified is not None:
+        return not_modified
     try:
-        wildcards = get_wildcards_from_db()
-        return wildcards
+        wildcards = await run_db(get_wildcards_from_db)
+        return FastJSONResponse(wildcards, headers=headers)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
     
 @app.get("/pruve/matchschedule", response_model=List[Matchschedule])
-async def get_matchschedules():
+async def get_matchschedules(request: Request):
+    headers, not_modified = conditional_get(request, CACHE_CONTROL["matchschedule"], "matchschedulev2")
+    if not_modified is not None:
+        return not_modified
     try:
-        matchschedules = get_matchcard_from_db()
-        return matchschedules
+        matchschedules = await run_db(get_matchcard_from_db)
+        return FastJSONResponse(matchschedules, headers=headers)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
-@app.get("/pruve/data", response_model=List[Union[ConversationModel, Matchschedule, wildcardModel]])
-async def get_data():
+class FeedPage(BaseModel):
+    items: List[Union[ConversationModel, Matchschedule, wildcardModel]]
+    next_cursor: Optional[str]
+
+@app.get("/pruve/data", response_model=FeedPage)
+async def get_data(request: Request, cursor: Optional[str] = None, limit: int = FEED_PAGE_SIZE):
+    limit = max(1, min(limit, FEED_MAX_PAGE_SIZE))
+    decode_feed_cursor(cursor)  # reject a bad cursor with a 400 before touching the database
+    headers, not_modified = conditional_get(request, CACHE_CONTROL["feed"],
+                                            *(table for table, _, _ in FEED_SOURCES.values()))
+    if not_modified is not None:
+        return not_modified
     try:
-        conversations = get_conversations_from_db()
-        matchschedules = get_matchcard_from_db()
-        wildcards = get_wildcards_from_db()
-        data = conversations + matchschedules + wildcards
-        return data
+        return FastJSONResponse(await get_feed_page(cursor, limit), headers=headers)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
     
@@ -426,7 +1837,7 @@ async def get_data():
 async def create_user(user: User):
     try:
         # Save User to DB and generate uid
-        uid = save_user_to_db(user)
+        uid = await run_db(save_user_to_db, user)
     except HTTPException as e:
         if e.status_code == 400:
             # User already exists, return uid
@@ -450,123 +1861,343 @@ async def create_user(user: User):
     return auth_response.dict()
 
 
-@app.post('/pruve/create_polls', response_model=Poll)
-def create_poll(poll: Poll):
+# Vote tallies, kept next to vote_pruve so reads never count votes.
+# Both tables are bumped in the transaction that inserts the vote.
+TALLY_TABLES_DDL = """
+    CREATE TABLE IF NOT EXISTS option_tally_pruve (
+        option_id integer PRIMARY KEY,
+        poll_id integer NOT NULL,
+        vote_count integer NOT NULL DEFAULT 0
+    );
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS option_tally_pruve_poll_id_idx ON option_tally_pruve (poll_id);
+    CREATE TABLE IF NOT EXISTS poll_tally_pruve (
+        poll_id integer PRIMARY KEY,
+        total_votes integer NOT NULL DEFAULT 0
+    );
+"""
+
+# The unique index fails if vote_pruve already holds duplicate votes; remove them before deploying
+POLL_INDEXES_DDL = """
+    CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS vote_pruve_user_id_poll_id_key ON vote_pruve (user_id, poll_id);
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS vote_pruve_poll_id_vote_id_idx ON vote_pruve (poll_id, vote_id);
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS option_pruve_v1_poll_id_idx ON option_pruve_v1 (poll_id);
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS answer_pruve_poll_id_idx ON answer_pruve (poll_id);
+"""
+
+
+# Polls and options that have no tally row yet, e.g. everything created
+# before the tally tables existed
+MISSING_TALLIES_QUERY = """
+    SELECT EXISTS (
+        SELECT 1 FROM option_pruve_v1 AS o
+        WHERE NOT EXISTS (SELECT 1 FROM option_tally_pruve AS t WHERE t.option_id = o.option_id)
+    ) OR EXISTS (
+        SELECT 1 FROM poll_pruve AS p
+        WHERE NOT EXISTS (SELECT 1 FROM poll_tally_pruve AS t WHERE t.poll_id = p.poll_id)
+    )
+"""
+
+
+def backfill_tallies(cur) -> dict:
+    """Count the votes of polls and options that have no tally row yet.
+
+    Rows that already exist are left alone; reconcile_tallies() is what
+    corrects them. ``cur`` is an autocommit cursor, the backfill runs in
+    its own transaction with vote_pruve locked against writes.
+    """
+    cur.execute(MISSING_TALLIES_QUERY)
+    if not cur.fetchone()[0]:
+        return {"options_added": 0, "polls_added": 0}
+    cur.execute("BEGIN")
     try:
-        # Check if the user exists
-        cur.execute("SELECT COUNT(*) FROM users_pruve WHERE uid = %s", (poll.user_id,))
-        if cur.fetchone()[0] == 0:
-            raise HTTPException(status_code=404, detail='User not found')
-
-        # Convert question and answer to lowercase
-        question_lower = poll.question.lower()
-        answer_lower = poll.answer.lower()
-
-        # Insert the poll into the 'poll_pruve' table
-        cur.execute("INSERT INTO poll_pruve (type, user_id, question, created_at) "
-                    "VALUES (%s, %s, %s, %s) RETURNING poll_id, created_at",
-                    ('wildcard', poll.user_id, question_lower, datetime.now()))
-        result = cur.fetchone()
-        poll_id = result[0]
-        created_at = result[1]
-
-        # Insert the options into the 'option_pruve' table
-        options = []
-        for option in poll.options:
-            option_text_lower = option.option_text.lower()  # Convert option text to lowercase
-            cur.execute("INSERT INTO option_pruve_v1 (poll_id, option_text) VALUES (%s, %s) RETURNING option_id",
-                        (poll_id, option_text_lower))
-            option_id = cur.fetchone()[0]
-            options.append({"option_id": option_id, "option_text": option_text_lower})
-
-        # Find the selected option_id based on the answer text
-        selected_option = next((option for option in options if option["option_text"] == answer_lower), None)
-        if not selected_option:
-            raise HTTPException(status_code=400, detail='Invalid answer')
-
-        selected_option_id = selected_option["option_id"]
-
-        # Insert the answer into the 'answer_pruve' table
-        cur.execute("INSERT INTO answer_pruve (poll_id, creator_id, option_id, answer_text) "
-                    "VALUES (%s, %s, %s, %s) RETURNING answer_id",
-                    (poll_id, poll.user_id, selected_option_id, answer_lower))
-        answer_id = cur.fetchone()[0]
-
-        # Insert a vote for the answer in the 'vote_pruve' table
-        cur.execute("INSERT INTO vote_pruve (poll_id, option_id, user_id) VALUES (%s, %s, %s)",
-                    (poll_id, selected_option_id, poll.user_id))
-
-        # Commit the transaction
-        conn.commit()
+        cur.execute("LOCK TABLE vote_pruve IN SHARE MODE")
+        cur.execute("""
+            INSERT INTO option_tally_pruve (option_id, poll_id, vote_count)
+            SELECT o.option_id, o.poll_id, COUNT(v.vote_id)
+            FROM option_pruve_v1 AS o
+            LEFT JOIN vote_pruve AS v ON v.option_id = o.option_id
+            WHERE NOT EXISTS (SELECT 1 FROM option_tally_pruve AS t WHERE t.option_id = o.option_id)
+            GROUP BY o.option_id, o.poll_id
+            ON CONFLICT (option_id) DO NOTHING
+        """)
+        options_added = cur.rowcount
+        cur.execute("""
+            INSERT INTO poll_tally_pruve (poll_id, total_votes)
+            SELECT p.poll_id, COUNT(v.vote_id)
+            FROM poll_pruve AS p
+            LEFT JOIN vote_pruve AS v ON v.poll_id = p.poll_id
+            WHERE NOT EXISTS (SELECT 1 FROM poll_tally_pruve AS t WHERE t.poll_id = p.poll_id)
+            GROUP BY p.poll_id
+            ON CONFLICT (poll_id) DO NOTHING
+        """)
+        polls_added = cur.rowcount
+        cur.execute("COMMIT")
+    except BaseException:
+        cur.execute("ROLLBACK")
+        raise
+    return {"options_added": options_added, "polls_added": polls_added}
 
-        new_poll = Poll(poll_id=poll_id, user_id=poll.user_id, question=poll.question,
-                        options=options, answer=poll.answer, created_at=created_at)
-        return new_poll
-    except psycopg2.Error as e:
-        conn.rollback()
-        error_message = str(e)
-        print("Error message:", error_message)
-        raise HTTPException(status_code=500, detail='Failed to create poll')
 
+def ensure_poll_tables():
+    with schema_session() as cur:
+        run_schema(cur, TALLY_TABLES_DDL + POLL_INDEXES_DDL)
+        backfill_tallies(cur)
 
 
+def reconcile_tallies() -> dict:
+    """Rebuild both tally tables from vote_pruve and report the rows that were off.
 
+    vote_pruve is locked against writes for the duration, so no vote can
+    land between counting and storing.
+    """
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("LOCK TABLE vote_pruve IN SHARE MODE")
+        cur.execute("""
+            INSERT INTO option_tally_pruve (option_id, poll_id, vote_count)
+            SELECT o.option_id, o.poll_id, COUNT(v.vote_id)
+            FROM option_pruve_v1 AS o
+            LEFT JOIN vote_pruve AS v ON v.option_id = o.option_id
+            GROUP BY o.option_id, o.poll_id
+            ON CONFLICT (option_id) DO UPDATE SET poll_id = EXCLUDED.poll_id, vote_count = EXCLUDED.vote_count
+            WHERE option_tally_pruve.vote_count <> EXCLUDED.vote_count
+               OR option_tally_pruve.poll_id <> EXCLUDED.poll_id
+        """)
+        options_fixed = cur.rowcount
+        cur.execute("""
+            INSERT INTO poll_tally_pruve (poll_id, total_votes)
+            SELECT p.poll_id, COUNT(v.vote_id)
+            FROM poll_pruve AS p
+            LEFT JOIN vote_pruve AS v ON v.poll_id = p.poll_id
+            GROUP BY p.poll_id
+            ON CONFLICT (poll_id) DO UPDATE SET total_votes = EXCLUDED.total_votes
+            WHERE poll_tally_pruve.total_votes <> EXCLUDED.total_votes
+        """)
+        polls_fixed = cur.rowcount
+        conn.commit()
+    return {"options_fixed": options_fixed, "polls_fixed": polls_fixed}
 
 
+def _reconcile_tallies_periodically(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            reconcile_tallies()
+        except (Exception, psycopg2.Error) as e:
+            print("Tally reconciliation failed:", str(e))
 
-@app.post('/pruve/polls/{poll_id}/vote', response_model=Vote)
-def vote(poll_id: int, vote: Vote):
+
+@app.on_event("startup")
+def prepare_poll_tables():
+    ensure_poll_tables()
+    if TALLY_RECONCILE_INTERVAL > 0:
+        threading.Thread(target=_reconcile_tallies_periodically, args=(TALLY_RECONCILE_INTERVAL,),
+                         name="pruve-tally-reconcile", daemon=True).start()
+
+
+@app.post('/pruve/tallies/reconcile', dependencies=[Depends(require_admin)])
+def post_reconcile_tallies():
     try:
-        # Check if the poll exists
-        cur.execute("""
-            SELECT COUNT(*) FROM poll_pruve WHERE poll_id = %s
-        """, (poll_id,))
-        if cur.fetchone()[0] == 0:
-            raise HTTPException(status_code=404, detail='Poll not found')
+        return reconcile_tallies()
+    except psycopg2.Error as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Creates a batch of polls in one round trip. Poll and option ids are drawn
+# from their sequences up front so every row can be linked to its input
+# without relying on the order RETURNING hands rows back in. Each creator's
+# answer is matched to its option here too (the first option with that text),
+# and gets the creator's vote and the starting tallies. Polls whose creator
+# does not exist are left out of the result.
+CREATE_POLLS_STATEMENT = """
+    WITH input AS (
+        SELECT i.ord, i.user_id, i.question, i.answer,
+            nextval(pg_get_serial_sequence('poll_pruve', 'poll_id')) AS poll_id
+        FROM unnest(%(user_ids)s::int[], %(questions)s::text[], %(answers)s::text[])
+            WITH ORDINALITY AS i(user_id, question, answer, ord)
+        WHERE EXISTS (SELECT 1 FROM users_pruve u WHERE u.uid = i.user_id)
+    ), option_input AS (
+        SELECT input.poll_id, o.option_text, o.position,
+            nextval(pg_get_serial_sequence('option_pruve_v1', 'option_id')) AS option_id
+        FROM unnest(%(option_polls)s::int[], %(option_texts)s::text[])
+            WITH ORDINALITY AS o(ord, option_text, position)
+        JOIN input ON input.ord = o.ord
+    ), answer AS (
+        SELECT DISTINCT ON (input.poll_id) input.poll_id, input.user_id, input.answer, option_input.option_id
+        FROM input
+        JOIN option_input ON option_input.poll_id = input.poll_id AND option_input.option_text = input.answer
+        ORDER BY input.poll_id, option_input.position
+    ), polls AS (
+        INSERT INTO poll_pruve (poll_id, type, user_id, question, created_at)
+        SELECT poll_id, 'wildcard', user_id, question, %(created_at)s FROM input
+    ), options AS (
+        INSERT INTO option_pruve_v1 (option_id, poll_id, option_text)
+        SELECT option_id, poll_id, option_text FROM option_input
+    ), answers AS (
+        INSERT INTO answer_pruve (poll_id, creator_id, option_id, answer_text)
+        SELECT poll_id, user_id, option_id, answer FROM answer
+    ), votes AS (
+        INSERT INTO vote_pruve (poll_id, option_id, user_id)
+        SELECT poll_id, option_id, user_id FROM answer
+    ), option_tallies AS (
+        INSERT INTO option_tally_pruve (option_id, poll_id, vote_count)
+        SELECT option_input.option_id, option_input.poll_id, (answer.option_id IS NOT NULL)::int
+        FROM option_input
+        LEFT JOIN answer ON answer.option_id = option_input.option_id
+    ), poll_tallies AS (
+        INSERT INTO poll_tally_pruve (poll_id, total_votes)
+        SELECT poll_id, 1 FROM answer
+    )
+    SELECT input.ord, input.poll_id, array_agg(option_input.option_id ORDER BY option_input.position)
+    FROM input
+    JOIN option_input ON option_input.poll_id = input.poll_id
+    GROUP BY input.ord, input.poll_id
+    ORDER BY input.ord
+"""
+POLL_BULK_MAX_POLLS = 1000
 
-        # Check if the option exists for the poll
-        cur.execute("""
-            SELECT COUNT(*) FROM option_pruve_v1 WHERE option_id = %s AND poll_id = %s
-        """, (vote.option_id, poll_id))
-        if cur.fetchone()[0] == 0:
-            # print("Option ID:", vote.option_id)
-            # print("Poll ID:", poll_id)
-            raise HTTPException(status_code=400, detail='Invalid option for the poll')
-
-        # Check if the user has already voted for the poll
-        cur.execute("""
-            SELECT COUNT(*) FROM vote_pruve WHERE user_id = %s AND poll_id = %s
-        """, (vote.user_id, poll_id))
-        if cur.fetchone()[0] > 0:
-            raise HTTPException(status_code=400, detail='User has already voted for the poll')
 
-        # Insert the vote into the 'vote' table
-        cur.execute("""
-            INSERT INTO vote_pruve (user_id, poll_id, option_id)
-            VALUES (%s, %s, %s)
-            RETURNING vote_id
-        """, (vote.user_id, poll_id, vote.option_id))
-        vote_id = cur.fetchone()[0]
+def insert_polls(cur, polls: List[Poll]) -> List[Poll]:
+    """Create ``polls`` in the caller's transaction, in a single statement.
 
-        # Commit the transaction
-        conn.commit()
+    Questions, options and answers are stored lowercased. Raises 400 if an
+    answer is not one of its poll's options and 404 if a creator does not
+    exist, leaving the transaction for the caller to roll back.
+    """
+    created_at = datetime.now()
+    params = {"user_ids": [], "questions": [], "answers": [], "option_polls": [], "option_texts": [],
+              "created_at": created_at}
+    for number, poll in enumerate(polls, 1):
+        option_texts = [option.option_text.lower() for option in poll.options]
+        if poll.answer.lower() not in option_texts:
+            raise HTTPException(status_code=400, detail='Invalid answer' if len(polls) == 1 else
+                                'Invalid answer for poll %d' % (number - 1))
+        params["user_ids"].append(poll.user_id)
+        params["questions"].append(poll.question.lower())
+        params["answers"].append(poll.answer.lower())
+        params["option_polls"].extend([number] * len(option_texts))
+        params["option_texts"].extend(option_texts)
+
+    cur.execute(CREATE_POLLS_STATEMENT, params)
+    rows = cur.fetchall()
+    if len(rows) < len(polls):
+        created = {row[0] for row in rows}
+        missing = next(number for number in range(1, len(polls) + 1) if number not in created)
+        raise HTTPException(status_code=404, detail='User not found' if len(polls) == 1 else
+                            'User not found for poll %d' % (missing - 1))
+
+    new_polls = []
+    for (_, poll_id, option_ids), poll in zip(rows, polls):
+        # The creator's vote went to the first option matching the answer
+        option_texts = [option.option_text.lower() for option in poll.options]
+        answer_position = option_texts.index(poll.answer.lower())
+        options = [{"option_id": option_id, "option_text": option_text, "vote_count": int(position == answer_position)}
+                   for position, (option_id, option_text) in enumerate(zip(option_ids, option_texts))]
+        new_polls.append(Poll(poll_id=poll_id, user_id=poll.user_id, question=poll.question,
+                              options=options, answer=poll.answer, created_at=created_at))
+    return new_polls
+
+
+@app.post('/pruve/create_polls', response_model=Poll, dependencies=[Depends(get_token_claims)])
+def create_poll(poll: Poll):
+    try:
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            new_poll = insert_polls(cur, [poll])[0]
+            stamp = announce_change(cur, ["polls"])
+            conn.commit()
+        resource_versions.bump("polls", at=stamp)
+        return new_poll
+    except psycopg2.Error as e:
+        error_message = str(e)
+        print("Error message:", error_message)
+        raise HTTPException(status_code=500, detail='Failed to create poll')
 
-        # Create a new Vote object without vote_id and poll_id
-        new_vote = Vote(user_id=vote.user_id, option_id=vote.option_id)
 
-        return new_vote
-    except HTTPException as e:
-        print("Error details:", e.detail)
-        conn.rollback()
+@app.post('/pruve/polls/bulk', response_model=List[Poll], dependencies=[Depends(get_token_claims)])
+def create_polls_bulk(bulk_request: PollBulkCreateRequest):
+    # All or nothing: one bad poll rejects the whole batch, and the error
+    # names its position in the request
+    if len(bulk_request.polls) > POLL_BULK_MAX_POLLS:
+        raise HTTPException(status_code=400, detail='At most %d polls per request' % POLL_BULK_MAX_POLLS)
+    if not bulk_request.polls:
+        return []
+    try:
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            new_polls = insert_polls(cur, bulk_request.polls)
+            stamp = announce_change(cur, ["polls"])
+            conn.commit()
+        resource_versions.bump("polls", at=stamp)
+        return new_polls
+    except psycopg2.Error as e:
+        print("Error message:", str(e))
+        raise HTTPException(status_code=500, detail='Failed to create polls')
+
+
+
+
+
+# One vote per user per poll: the unique index settles concurrent votes, the
+# CTE validates, inserts and counts the vote in a single round trip.
+VOTE_STATEMENT = """
+    WITH poll AS (
+        SELECT poll_id FROM poll_pruve WHERE poll_id = %(poll_id)s
+    ), valid_option AS (
+        SELECT option_id FROM option_pruve_v1 WHERE option_id = %(option_id)s AND poll_id = %(poll_id)s
+    ), inserted AS (
+        INSERT INTO vote_pruve (user_id, poll_id, option_id)
+        SELECT %(user_id)s, %(poll_id)s, option_id FROM valid_option
+        ON CONFLICT (user_id, poll_id) DO NOTHING
+        RETURNING vote_id, option_id
+    ), option_tally AS (
+        INSERT INTO option_tally_pruve (option_id, poll_id, vote_count)
+        SELECT option_id, %(poll_id)s, 1 FROM inserted
+        ON CONFLICT (option_id) DO UPDATE SET vote_count = option_tally_pruve.vote_count + 1
+    ), poll_tally AS (
+        INSERT INTO poll_tally_pruve (poll_id, total_votes)
+        SELECT %(poll_id)s, 1 FROM inserted
+        ON CONFLICT (poll_id) DO UPDATE SET total_votes = poll_tally_pruve.total_votes + 1
+    ), notified AS (
+        SELECT vote_id, stamp, pg_notify(%(channel)s, json_build_object('topic', 'poll:' || %(poll_id)s, 'key', option_id,
+                                                                        'resources', json_build_array('polls'),
+                                                                        'at', stamp)::text)
+        FROM inserted, (SELECT """ + CHANGE_STAMP_SQL + """ AS stamp) AS now
+    ), stored AS (""" + store_stamps_sql("unnest(ARRAY['polls'])", "notified") + """)
+    SELECT EXISTS (SELECT 1 FROM poll), EXISTS (SELECT 1 FROM valid_option), (SELECT vote_id FROM notified),
+        (SELECT stamp FROM notified)
+"""
+
+
+@app.post('/pruve/polls/{poll_id}/vote', response_model=Vote, dependencies=[Depends(get_token_claims)])
+def vote(poll_id: int, vote: Vote):
+    try:
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(VOTE_STATEMENT, {"poll_id": poll_id, "option_id": vote.option_id, "user_id": vote.user_id,
+                                         "channel": TALLY_CHANNEL})
+            poll_found, option_valid, vote_id, stamp = cur.fetchone()
+            conn.commit()
+    except psycopg2.Error as e:
+        print("Error message:", str(e))
         raise HTTPException(status_code=500, detail='Failed to record vote')
 
+    if not poll_found:
+        raise HTTPException(status_code=404, detail='Poll not found')
+    if not option_valid:
+        raise HTTPException(status_code=400, detail='Invalid option for the poll')
+    if vote_id is None:
+        raise HTTPException(status_code=409, detail='User has already voted for the poll')
+    resource_versions.bump("polls", at=stamp)
+
+    # Create a new Vote object without vote_id and poll_id
+    return Vote(user_id=vote.user_id, option_id=vote.option_id)
+
 def get_vote_count(option_id):
-    cur.execute("""
-        SELECT COUNT(*) AS vote_count
-        FROM vote_pruve
-        WHERE option_id = %s
-    """, (option_id,))
-    vote_count = cur.fetchone()[0]
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT vote_count
+            FROM option_tally_pruve
+            WHERE option_id = %s
+        """, (option_id,))
+        row = cur.fetchone()
+        vote_count = row[0] if row else 0
     return vote_count
 
 
@@ -574,22 +2205,23 @@ def get_vote_count(option_id):
 def get_user_polls(user_id: int):
     try:
         # Fetch all polls and related information, including the picture column
-        cur.execute("""
-            SELECT p.poll_id, p.type, p.user_id, p.question, o.option_id AS answer_id, p.created_at, u.name AS creator,
-                o.option_id, o.option_text, u.picture,
-                COUNT(v.option_id) AS vote_count,
-                MAX(CASE WHEN v.user_id = %s THEN v.option_id END) AS user_selected,
-                ARRAY_AGG(uv.name) FILTER (WHERE uv.name IS NOT NULL) AS voters
-            FROM poll_pruve AS p
-            INNER JOIN users_pruve AS u ON p.user_id = u.uid
-            INNER JOIN option_pruve_v1 AS o ON p.poll_id = o.poll_id
-            LEFT JOIN vote_pruve AS v ON o.option_id = v.option_id
-            LEFT JOIN users_pruve AS uv ON v.user_id = uv.uid
-            WHERE p.user_id = %s
-            GROUP BY p.poll_id, p.type, p.user_id, p.question, o.option_id, o.option_text, answer_id, p.created_at, u.name, u.picture
-        """, (user_id, user_id))
-
-        results = cur.fetchall()
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT p.poll_id, p.type, p.user_id, p.question, o.option_id AS answer_id, p.created_at, u.name AS creator,
+                    o.option_id, o.option_text, u.picture,
+                    COUNT(v.option_id) AS vote_count,
+                    MAX(CASE WHEN v.user_id = %s THEN v.option_id END) AS user_selected,
+                    ARRAY_AGG(uv.name) FILTER (WHERE uv.name IS NOT NULL) AS voters
+                FROM poll_pruve AS p
+                INNER JOIN users_pruve AS u ON p.user_id = u.uid
+                INNER JOIN option_pruve_v1 AS o ON p.poll_id = o.poll_id
+                LEFT JOIN vote_pruve AS v ON o.option_id = v.option_id
+                LEFT JOIN users_pruve AS uv ON v.user_id = uv.uid
+                WHERE p.user_id = %s
+                GROUP BY p.poll_id, p.type, p.user_id, p.question, o.option_id, o.option_text, answer_id, p.created_at, u.name, u.picture
+            """, (user_id, user_id))
+
+            results = cur.fetchall()
         poll_votes = []
         for row in results:
             poll_id, poll_type, poll_user_id, question, answer_id, created_at, creator, option_id, option_text, picture, vote_count, user_selected, voters = row
@@ -597,7 +2229,7 @@ def get_user_polls(user_id: int):
             # Check if the poll already exists in poll_votes list
             existing_poll = next((poll for poll in poll_votes if poll.poll_id == poll_id), None)
             if existing_poll:
-                existing_poll.options.append({"option_id": option_id, "option_text": option_text, "vote_count": vote_count})
+                existing_poll.options.append(Option(option_id=option_id, option_text=option_text, vote_count=vote_count))
                 if user_selected:
                     existing_poll.user_selected = user_selected
                 if voters:
@@ -610,7 +2242,7 @@ def get_user_polls(user_id: int):
                     question=question,
                     answer_id=answer_id,  # Use the answer_id instead of answer text
                     created_at=created_at,
-                    authorSelectedId=creator,
+                    creator=creator,
                     predictionAccuracy=76,
                     picture=picture,
                     options=[Option(option_id=option_id, option_text=option_text, vote_count=vote_count)],
@@ -629,7 +2261,6 @@ def get_user_polls(user_id: int):
         return poll_votes
 
     except psycopg2.Error as e:
-        conn.rollback()
         error_message = str(e)
         print("Error message:", error_message)
         raise HTTPException(status_code=500, detail='Failed to fetch polls')
@@ -639,20 +2270,21 @@ def get_user_polls(user_id: int):
 def get_user_polls(user_id: int):
     try:
         # Fetch all polls and related information, including the picture column
-        cur.execute("""
-            SELECT p.poll_id, p.type, p.user_id, p.question, o.option_id AS answer_id, p.created_at, u.name AS creator,
-                o.option_id, o.option_text,
-                COUNT(v.option_id) AS vote_count,
-                MAX(CASE WHEN v.user_id = %s THEN v.option_id END) AS user_selected,
-                u.picture  -- Fetch the picture column
-            FROM poll_pruve AS p
-            INNER JOIN users_pruve AS u ON p.user_id = u.uid
-            INNER JOIN option_pruve_v1 AS o ON p.poll_id = o.poll_id
-            LEFT JOIN vote_pruve AS v ON o.option_id = v.option_id
-            GROUP BY p.poll_id, p.type, p.user_id, p.question, o.option_id, o.option_text, answer_id, p.created_at, u.name, u.picture
-        """, (user_id,))
-
-        results = cur.fetchall()
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT p.poll_id, p.type, p.user_id, p.question, o.option_id AS answer_id, p.created_at, u.name AS creator,
+                    o.option_id, o.option_text,
+                    COUNT(v.option_id) AS vote_count,
+                    MAX(CASE WHEN v.user_id = %s THEN v.option_id END) AS user_selected,
+                    u.picture  -- Fetch the picture column
+                FROM poll_pruve AS p
+                INNER JOIN users_pruve AS u ON p.user_id = u.uid
+                INNER JOIN option_pruve_v1 AS o ON p.poll_id = o.poll_id
+                LEFT JOIN vote_pruve AS v ON o.option_id = v.option_id
+                GROUP BY p.poll_id, p.type, p.user_id, p.question, o.option_id, o.option_text, answer_id, p.created_at, u.name, u.picture
+            """, (user_id,))
+
+            results = cur.fetchall()
         poll_votes = []
         for row in results:
             poll_id, poll_type, poll_user_id, question, answer_id, created_at, creator, option_id, option_text, vote_count, user_selected, picture = row
@@ -687,7 +2319,6 @@ def get_user_polls(user_id: int):
         return poll_votes
 
     except psycopg2.Error as e:
-        conn.rollback()
         error_message = str(e)
         print("Error message:", error_message)
         raise HTTPException(status_code=500, detail='Failed to fetch polls')
@@ -697,93 +2328,260 @@ def get_user_polls(user_id: int):
 
 
 
-@app.get('/pruve/user/{user_id}/polls', response_model=List[PollVote])
-def get_user_polls(user_id: int):
-    try:
-        # Fetch all polls and related information, including the picture column and all options
-        cur.execute("""
-            SELECT p.poll_id, p.type, p.user_id, p.question, a.option_id AS answer_id, p.created_at, u.name AS creator,
-                ans.option_id AS author_selected_option_id,
-                o.option_id, o.option_text,
-                COUNT(v.option_id) AS vote_count,
-                (SELECT v1.option_id FROM vote_pruve v1 WHERE v1.user_id = %s AND v1.poll_id = p.poll_id LIMIT 1) AS user_selected,
-                ARRAY_AGG(uv.name) FILTER (WHERE uv.name IS NOT NULL) AS voters,
-                u.picture,
-                SUM(COUNT(v.option_id)) OVER (PARTITION BY p.poll_id) AS total_vote_count
-            FROM poll_pruve AS p
-            INNER JOIN users_pruve AS u ON p.user_id = u.uid
-            INNER JOIN option_pruve_v1 AS o ON p.poll_id = o.poll_id
-            LEFT JOIN answer_pruve AS a ON p.poll_id = a.poll_id
-            LEFT JOIN option_pruve_v1 AS ans ON a.option_id = ans.option_id
-            LEFT JOIN vote_pruve AS v ON o.option_id = v.option_id
-            LEFT JOIN users_pruve AS uv ON v.user_id = uv.uid
+def load_poll_options(cur, poll_ids: List[int]) -> Dict[int, List[Option]]:
+    """Options of every poll in ``poll_ids`` with their tallies, in one query."""
+    options = {poll_id: [] for poll_id in poll_ids}
+    cur.execute("""
+        SELECT o.poll_id, o.option_id, o.option_text, COALESCE(ot.vote_count, 0)
+        FROM option_pruve_v1 AS o
+        LEFT JOIN option_tally_pruve AS ot ON ot.option_id = o.option_id
+        WHERE o.poll_id = ANY(%s)
+        ORDER BY o.option_id
+    """, (poll_ids,))
+    for poll_id, option_id, option_text, vote_count in cur.fetchall():
+        options[poll_id].append(Option(option_id=option_id, option_text=option_text, vote_count=vote_count))
+    return options
 
-            GROUP BY p.poll_id, p.type, p.user_id, p.question, a.option_id, ans.option_id, o.option_id, o.option_text, answer_id, p.created_at, u.name, u.picture
-            ORDER BY p.poll_id DESC
-        """, (user_id,))
 
-        results = cur.fetchall()
-        poll_votes = {}
-        for row in results:
-            poll_id, poll_type, poll_user_id, question, answer_id, created_at, creator, author_selected_option_id, option_id, option_text, vote_count, user_selected, voters, picture, total_vote_count = row
-            print(user_selected)
-            if poll_id not in poll_votes:
-                poll_votes[poll_id] = PollVote(
-                    poll_id=poll_id,
-                    type=poll_type,
-                    user_id=poll_user_id,
-                    question=question,
-                    answer_id=answer_id,
-                    created_at=created_at,
-                    creator=creator,
-                    predictionAccuracy=76,
-                    picture=picture,
-                    options=[],
-                    user_selected=user_selected,
-                    voters=[],
-                    author_selected_option_id=author_selected_option_id,
-                    total_vote_count=total_vote_count
-                )
+def load_user_selections(cur, user_id: int, poll_ids: List[int]) -> Dict[int, int]:
+    """The option ``user_id`` picked in each of ``poll_ids`` they voted on."""
+    cur.execute("SELECT poll_id, option_id FROM vote_pruve WHERE user_id = %s AND poll_id = ANY(%s)",
+                (user_id, poll_ids))
+    return dict(cur.fetchall())
 
-            poll_votes[poll_id].options.append(
-                Option(option_id=option_id, option_text=option_text, vote_count=vote_count))
-            if voters:
-                poll_votes[poll_id].voters.extend(voters)
 
-        return list(poll_votes.values())
+def load_poll_voters(cur, poll_ids: List[int], limit: int = VOTER_PREVIEW_SIZE) -> Dict[int, List[str]]:
+    """Names of the first ``limit`` voters of each poll, read off the (poll_id, vote_id) index."""
+    voters = {poll_id: [] for poll_id in poll_ids}
+    cur.execute("""
+        SELECT p.poll_id, v.user_id
+        FROM unnest(%s::int[]) AS p (poll_id)
+        CROSS JOIN LATERAL (
+            SELECT user_id, vote_id FROM vote_pruve
+            WHERE poll_id = p.poll_id
+            ORDER BY vote_id
+            LIMIT %s
+        ) AS v
+        ORDER BY p.poll_id, v.vote_id
+    """, (poll_ids, limit))
+    rows = cur.fetchall()
+    profiles = user_profile_cache.get_many(cur, [user_id for _, user_id in rows])
+    for poll_id, user_id in rows:
+        if user_id in profiles:
+            voters[poll_id].append(profiles[user_id]["name"])
+    return voters
+
+
+class PollFeedPage(BaseModel):
+    user_id: int
+    polls: List[PollVote]
+    next_cursor: Optional[int]
+
 
+@app.get('/pruve/user/{user_id}/polls', response_model=PollFeedPage)
+def get_user_polls(user_id: int, request: Request, response: Response, cursor: Optional[int] = None,
+                   limit: int = 20):
+    limit = max(1, min(limit, 100))
+    headers, not_modified = conditional_get(request, CACHE_CONTROL["polls"], "polls")
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(headers)
+
+    # Retrieve one page of polls, newest first; `cursor` is the last poll_id
+    # of the previous page
+    query = """
+        SELECT p.poll_id, p.type, p.user_id, p.question, a.option_id, p.created_at,
+            ans.option_id, COALESCE(pt.total_votes, 0)
+        FROM poll_pruve AS p
+        LEFT JOIN LATERAL (
+            SELECT option_id FROM answer_pruve WHERE poll_id = p.poll_id ORDER BY answer_id LIMIT 1
+        ) AS a ON TRUE
+        LEFT JOIN option_pruve_v1 AS ans ON a.option_id = ans.option_id
+        LEFT JOIN poll_tally_pruve AS pt ON p.poll_id = pt.poll_id
+    """
+    params = []
+    if cursor is not None:
+        query += " WHERE p.poll_id < %s"
+        params.append(cursor)
+    query += " ORDER BY p.poll_id DESC LIMIT %s"
+    params.append(limit + 1)
+
+    try:
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, params)
+            polls = cur.fetchall()
+            has_more = len(polls) > limit
+            polls = polls[:limit]
+
+            # Everything else for the page comes from one query per kind of detail
+            poll_ids = [poll[0] for poll in polls]
+            options = load_poll_options(cur, poll_ids)
+            selections = load_user_selections(cur, user_id, poll_ids)
+            voters = load_poll_voters(cur, poll_ids)
+            creators = user_profile_cache.get_many(cur, [poll[2] for poll in polls])
     except psycopg2.Error as e:
-        conn.rollback()
         error_message = str(e)
         print("Error message:", error_message)
         raise HTTPException(status_code=500, detail='Failed to fetch polls')
 
+    poll_votes = []
+    for (poll_id, poll_type, poll_user_id, question, answer_id, created_at,
+         author_selected_option_id, total_vote_count) in polls:
+        if poll_user_id not in creators:
+            continue
+        poll_votes.append(PollVote(
+            poll_id=poll_id,
+            type=poll_type,
+            user_id=poll_user_id,
+            question=question,
+            answer_id=answer_id,
+            created_at=created_at,
+            creator=creators[poll_user_id]["name"],
+            predictionAccuracy=76,
+            picture=creators[poll_user_id]["picture"],
+            options=options[poll_id],
+            user_selected=selections.get(poll_id),
+            voters=voters[poll_id],
+            author_selected_option_id=author_selected_option_id,
+            total_vote_count=total_vote_count
+        ))
+
+    next_cursor = polls[-1][0] if has_more else None
+    return {"user_id": user_id, "polls": poll_votes, "next_cursor": next_cursor}
+
+@app.get('/pruve/polls/{poll_id}/voters')
+def get_poll_voters(poll_id: int, cursor: Optional[int] = None, limit: int = 50):
+    limit = max(1, min(limit, 500))
+
+    # Retrieve one page of voters in the order they voted; `cursor` is the
+    # next_cursor of the previous page
+    query = """
+        SELECT v.vote_id, v.user_id
+        FROM vote_pruve AS v
+        WHERE v.poll_id = %s
+    """
+    params = [poll_id]
+    if cursor is not None:
+        query += " AND v.vote_id > %s"
+        params.append(cursor)
+    query += " ORDER BY v.vote_id LIMIT %s"
+    params.append(limit + 1)
+
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM poll_pruve WHERE poll_id = %s", (poll_id,))
+        if cur.fetchone() is None:
+            raise HTTPException(status_code=404, detail='Poll not found')
+        cur.execute(query, params)
+        voters = cur.fetchall()
+        has_more = len(voters) > limit
+        voters = voters[:limit]
+        profiles = user_profile_cache.get_many(cur, [user_id for _, user_id in voters])
+
+    next_cursor = voters[-1][0] if has_more else None
+    return {
+        "poll_id": poll_id,
+        "voters": [{"user_id": user_id, "user_name": profiles[user_id]["name"],
+                    "user_picture": profiles[user_id]["picture"]}
+                   for _, user_id in voters if user_id in profiles],
+        "next_cursor": next_cursor
+    }
+
+class BatchLoader:
+    """Request-scoped, DataLoader-style batching of lookups by key.
+
+    ``load_many`` resolves every key it has not seen yet with a single call
+    to ``load_batch(keys) -> {key: value}`` and remembers the results for
+    the rest of the request; keys the batch does not return load as None.
+    """
+
+    def __init__(self, load_batch):
+        self._load_batch = load_batch
+        self._values = {}
+
+    def load(self, key):
+        return self.load_many([key])[0]
+
+    def load_many(self, keys: list) -> list:
+        missing = [key for key in dict.fromkeys(keys) if key not in self._values]
+        if missing:
+            found = self._load_batch(missing)
+            for key in missing:
+                self._values[key] = found.get(key)
+        return [self._values[key] for key in keys]
+
+
+class PollLoaders:
+    """The batch loaders behind the /pruve/polls endpoints, sharing one cursor.
+
+    ``queries`` counts the statements they have run, which the endpoints
+    report in an ``X-Query-Count`` header, errors included.
+    """
+
+    def __init__(self, cur):
+        self.cur = cur
+        self.queries = 0
+        self.polls = BatchLoader(self._load_polls)
+        self.options = BatchLoader(self._load_options)
+        self.users = BatchLoader(self._load_users)
+        self.voters = BatchLoader(self._load_voters)
+
+    def headers(self) -> dict:
+        return {"X-Query-Count": str(self.queries)}
+
+    def fetchall(self, query: str, params=None) -> list:
+        self.queries += 1
+        self.cur.execute(query, params)
+        return self.cur.fetchall()
+
+    def _load_polls(self, poll_ids: list) -> dict:
+        rows = self.fetchall("SELECT * FROM poll WHERE poll_id = ANY(%s)", (poll_ids,))
+        return {row[0]: row for row in rows}
+
+    def _load_options(self, poll_ids: list) -> Dict[int, List[Option]]:
+        options = {poll_id: [] for poll_id in poll_ids}
+        rows = self.fetchall("SELECT poll_id, option_id, option_text FROM option WHERE poll_id = ANY(%s) "
+                             "ORDER BY option_id", (poll_ids,))
+        for poll_id, option_id, option_text in rows:
+            options[poll_id].append(Option(option_id=option_id, option_text=option_text, vote_count=None))
+        return options
+
+    def _load_users(self, user_ids: list) -> dict:
+        rows = self.fetchall("SELECT user_id, name, email, picture FROM users WHERE user_id = ANY(%s)", (user_ids,))
+        return {row[0]: row for row in rows}
+
+    def _load_voters(self, poll_ids: list) -> Dict[int, List[tuple]]:
+        """(user_id, number of votes) pairs for everyone who voted in each poll."""
+        voters = {poll_id: [] for poll_id in poll_ids}
+        rows = self.fetchall("SELECT poll_id, user_id, COUNT(*) FROM vote WHERE poll_id = ANY(%s) "
+                             "GROUP BY poll_id, user_id", (poll_ids,))
+        for poll_id, user_id, votes in rows:
+            voters[poll_id].append((user_id, votes))
+        return voters
+
+
 @app.get('/pruve/polls/{poll_id}', response_model=Dict[str, Union[Dict[str, Union[int, str, List[str], User]], Dict[str, Union[int, List[Dict[str, Union[int, str]]]]]]])
-def get_poll_and_results(poll_id: int):
+def get_poll_and_results(poll_id: int, response: Response):
+    loaders = None
     try:
-        # Check if the poll exists
-        cur.execute("""
-            SELECT * FROM poll WHERE poll_id = %s
-        """, (poll_id,))
-        poll_data = cur.fetchone()
-        if poll_data is None:
-            raise HTTPException(status_code=404, detail='Poll not found')
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            loaders = PollLoaders(cur)
 
-        # Retrieve the options for the poll
-        cur.execute("""
-            SELECT option_text FROM option WHERE poll_id = %s
-        """, (poll_id,))
-        options = [row[0] for row in cur.fetchall()]
+            # Check if the poll exists
+            poll_data = loaders.polls.load(poll_id)
+            if poll_data is None:
+                raise HTTPException(status_code=404, detail='Poll not found', headers=loaders.headers())
 
-        # Retrieve the details of the user who created the poll
-        cur.execute("""
-            SELECT user_id, name, email, picture FROM users WHERE user_id = %s
-        """, (poll_data[2],))
-        user_data = cur.fetchone()
-        if user_data is None:
-            raise HTTPException(status_code=404, detail='User not found')
+            # Retrieve the options and the voters for the poll
+            options = [option.option_text for option in loaders.options.load(poll_id)]
+            voters = loaders.voters.load(poll_id)
+            voted_users = [user_id for user_id, _ in voters]
 
-        user = User(user_id=user_data[0], name=user_data[1], email=user_data[2], picture=user_data[3])
+            # Retrieve the creator and every voter in one lookup
+            creator_data, *voted_users_data = loaders.users.load_many([poll_data[2]] + voted_users)
+            if creator_data is None:
+                raise HTTPException(status_code=404, detail='User not found', headers=loaders.headers())
+
+        user = User(uid=creator_data[0], name=creator_data[1], email=creator_data[2], picture=creator_data[3])
 
         poll = {
             'poll_id': poll_data[0],
@@ -794,81 +2592,59 @@ def get_poll_and_results(poll_id: int):
             'user': user
         }
 
-        # Retrieve the total count of votes
-        cur.execute("""
-            SELECT COUNT(*) FROM vote WHERE poll_id = %s
-        """, (poll_id,))
-        total_count = cur.fetchone()[0]
-
-        # Retrieve the list of users who voted
-        cur.execute("""
-            SELECT DISTINCT user_id FROM vote WHERE poll_id = %s
-        """, (poll_id,))
-        voted_users = [row[0] for row in cur.fetchall()]
-
-        # Retrieve the details of the users who voted
-        voted_users_details = []
-        for voted_user_id in voted_users:
-            cur.execute("""
-                SELECT user_id, name, email, picture FROM users WHERE user_id = %s
-            """, (voted_user_id,))
-            voted_user_data = cur.fetchone()
-            if voted_user_data is not None:
-                voted_user = {
-                    'user_id': voted_user_data[0],
-                    'name': voted_user_data[1],
-                    'email': voted_user_data[2],
-                    'picture': voted_user_data[3]
-                }
-                voted_users_details.append(voted_user)
+        voted_users_details = [
+            {
+                'user_id': voted_user_data[0],
+                'name': voted_user_data[1],
+                'email': voted_user_data[2],
+                'picture': voted_user_data[3]
+            }
+            for voted_user_data in voted_users_data if voted_user_data is not None
+        ]
 
         results = {
-            'total_count': total_count,
+            'total_count': sum(votes for _, votes in voters),
             'voted_users': voted_users_details
         }
 
-        response = {
+        response.headers.update(loaders.headers())
+        return {
             'poll': poll,
             'results': results
         }
-
-        return response
     except psycopg2.Error as e:
-        raise HTTPException(status_code=500, detail='Failed to retrieve poll and results')
-
-
-
-def get_options_for_poll(poll_id: int) -> List[Option]:
-    cur.execute("SELECT option_id, option_text FROM option WHERE poll_id = %s", (poll_id,))
-    option_rows = cur.fetchall()
-
-    options = []
-    for option_row in option_rows:
-        option_id, option_text = option_row
-        option = Option(option_id=option_id, option_text=option_text)
-        options.append(option)
-
-    return options
+        raise HTTPException(status_code=500, detail='Failed to retrieve poll and results',
+                            headers=loaders.headers() if loaders else None)
 
 
+# Polls in the legacy poll table have no answer, so they are listed without one
+class LegacyPoll(BaseModel):
+    poll_id: int
+    type: str = 'wildcard'
+    user_id: int
+    question: str
+    options: List[Option]
 
 
-@app.get('/pruve/polls', response_model=List[Poll])
-def get_all_polls():
+@app.get('/pruve/polls', response_model=List[LegacyPoll])
+def get_all_polls(response: Response):
+    loaders = None
     try:
-        cur.execute("SELECT poll_id, user_id, question FROM poll")
-        poll_rows = cur.fetchall()
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            loaders = PollLoaders(cur)
+            poll_rows = loaders.fetchall("SELECT poll_id, user_id, question FROM poll")
+
+            # Fetch the options of every poll at once
+            poll_options = loaders.options.load_many([poll_id for poll_id, _, _ in poll_rows])
 
-        polls = []
-        for poll_row in poll_rows:
-            poll_id, user_id, question = poll_row
-            options = get_options_for_poll(poll_id)  # Fetch options from the database
-            poll = Poll(poll_id=poll_id, user_id=user_id, question=question, options=options)
-            polls.append(poll)
+        polls = [LegacyPoll(poll_id=poll_id, user_id=user_id, question=question, options=options)
+                 for (poll_id, user_id, question), options in zip(poll_rows, poll_options)]
 
+        response.headers.update(loaders.headers())
         return polls
     except psycopg2.Error as e:
-        raise HTTPException(status_code=500, detail='Failed to fetch polls')
+        raise HTTPException(status_code=500, detail='Failed to fetch polls',
+                            headers=loaders.headers() if loaders else None)
 
 class Comment(BaseModel):
     comment_id: int
@@ -878,109 +2654,220 @@ class Comment(BaseModel):
     teams: List
     comment_text: str
 
-@app.get("/pruve/comments/{match_number}")
-def get_comments(match_number: int) -> List[Comment]:
-    try:
-        # Execute the SQL query
-        query = """
-        SELECT
-            c.comment_id,
-            c.type,
-            json_build_object('uid', u.uid, 'email', u.email, 'name', u.name, 'picture', u.picture) AS user_details,
-            c.time,
-            json_build_array(
-                json_build_object('nickName', t1."nickName", 'isUserSelected', mv.team_id = t1.team_id),
-                json_build_object('nickName', t2."nickName", 'isUserSelected', mv.team_id = t2.team_id)
-            ) AS teams,
-            c.comment_text
-        FROM
-            public.comments_table_pruve AS c
-            INNER JOIN public.users_pruve AS u ON c.user_id = u.uid
-            INNER JOIN public.matchschedule AS m ON c.match_number = m.match_number
-            INNER JOIN public.team_list AS t1 ON m.team1_id = t1.team_id
-            INNER JOIN public.team_list AS t2 ON m.team2_id = t2.team_id
-            LEFT JOIN public.match_vote_pruve AS mv ON c.vote_id = mv.vote_id
-        WHERE
-            c.match_number = %s;
-        """
+COMMENTS_SELECT = """
+    SELECT
+        c.comment_id,
+        c.type,
+        c.user_id,
+        c.time,
+        json_build_array(
+            json_build_object('nickName', t1."nickName", 'isUserSelected', mv.team_id = t1.team_id),
+            json_build_object('nickName', t2."nickName", 'isUserSelected', mv.team_id = t2.team_id)
+        ) AS teams,
+        c.comment_text
+    FROM
+        public.comments_table_pruve AS c
+        INNER JOIN public.matchschedule AS m ON c.match_number = m.match_number
+        INNER JOIN public.team_list AS t1 ON m.team1_id = t1.team_id
+        INNER JOIN public.team_list AS t2 ON m.team2_id = t2.team_id
+        LEFT JOIN public.match_vote_pruve AS mv ON c.vote_id = mv.vote_id
+"""
+
+# Rows fetched per round trip when streaming every comment
+COMMENT_STREAM_CHUNK_SIZE = 1000
+comment_streams = threading.BoundedSemaphore(COMMENT_STREAM_MAX_STREAMS)
+
+
+def comment_from_row(row, profiles: Dict[int, dict]) -> Optional[dict]:
+    """The comment as a dict, or None if its author is gone."""
+    user_details = profiles.get(row[2])
+    if user_details is None:
+        return None
+    return {
+        "comment_id": row[0],
+        "type": row[1],
+        "user_details": user_details,
+        "time": row[3].strftime("%Y-%m-%d %H:%M:%S"),
+        "teams": row[4],
+        "comment_text": row[5]
+    }
+
+
+# Thread pages are read newest first along this index
+COMMENT_INDEXES_DDL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS comments_table_pruve_match_time_idx
+        ON comments_table_pruve (match_number, time, comment_id);
+"""
+COMMENT_PAGE_SIZE = 50
+COMMENT_MAX_PAGE_SIZE = 500
+
+
+@app.on_event("startup")
+def ensure_comment_indexes():
+    apply_schema(COMMENT_INDEXES_DDL)
 
-        cur.execute(query, (match_number,))
-        rows = cur.fetchall()
 
-        # Construct the Comment objects from the query results
-        comments = []
-        for row in rows:
-            user_details = {
-                "uid": row[2]['uid'],
-                "email": row[2]['email'],
-                "name": row[2]['name'],
-                "picture": row[2]['picture']
-            }
-            comment = Comment(
-                comment_id=row[0],
-                type=row[1],
-                user_details=user_details,
-                time=row[3].strftime("%Y-%m-%d %H:%M:%S"),
-                teams=row[4],
-                comment_text=row[5]
-            )
-            comments.append(comment)
+@app.get("/pruve/comments/{match_number}")
+def get_comments(match_number: int, request: Request, limit: int = COMMENT_PAGE_SIZE, before: Optional[int] = None,
+                 since_id: Optional[int] = None) -> List[Comment]:
+    """A page of a match's comments, ordered by (time, comment_id).
+
+    Without ``since_id`` the newest ``limit`` comments come back newest
+    first; pass the last ``comment_id`` of a page as ``before`` to get the
+    page after it. With ``since_id`` only comments newer than that one come
+    back, oldest first, so a client polling a live thread can keep passing
+    the last id it has seen.
+    """
+    if before is not None and since_id is not None:
+        raise HTTPException(status_code=400, detail='Use either before or since_id, not both')
+    limit = max(1, min(limit, COMMENT_MAX_PAGE_SIZE))
+    headers, not_modified = conditional_get(request, CACHE_CONTROL["comments"], "comments:%d" % match_number)
+    if not_modified is not None:
+        return not_modified
+
+    query = COMMENTS_SELECT + " WHERE c.match_number = %s"
+    params = [match_number]
+    if since_id is not None:
+        query += (" AND (c.time, c.comment_id) > (SELECT time, comment_id FROM comments_table_pruve WHERE comment_id = %s)"
+                  " ORDER BY c.time, c.comment_id")
+        params.append(since_id)
+    else:
+        if before is not None:
+            query += " AND (c.time, c.comment_id) < (SELECT time, comment_id FROM comments_table_pruve WHERE comment_id = %s)"
+            params.append(before)
+        query += " ORDER BY c.time DESC, c.comment_id DESC"
+    query += " LIMIT %s"
+    params.append(limit)
 
-        return comments
+    try:
+        with db_pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+            profiles = user_profile_cache.get_many(cur, [row[2] for row in rows])
+
+        comments = (comment_from_row(row, profiles) for row in rows)
+        return FastJSONResponse([comment for comment in comments if comment is not None], headers=headers)
 
     except (Exception, psycopg2.Error) as error:
         raise HTTPException(status_code=500, detail=str(error))
 
-@app.get("/pruve/comments/")
-def get_comments():
-    try:
-        # Execute the SQL query
-        query = """
-        SELECT
-            c.comment_id,
-            c.type,
-            json_build_object('uid', u.uid, 'email', u.email, 'name', u.name, 'picture', u.picture) AS user_details,
-            c.time,
-            json_build_array(
-                json_build_object('nickName', t1."nickName", 'isUserSelected', mv.team_id = t1.team_id),
-                json_build_object('nickName', t2."nickName", 'isUserSelected', mv.team_id = t2.team_id)
-            ) AS teams,
-            c.comment_text
-        FROM
-            public.comments_table_pruve AS c
-            INNER JOIN public.users_pruve AS u ON c.user_id = u.uid
-            INNER JOIN public.matchschedule AS m ON c.match_number = m.match_number
-            INNER JOIN public.team_list AS t1 ON m.team1_id = t1.team_id
-            INNER JOIN public.team_list AS t2 ON m.team2_id = t2.team_id
-            LEFT JOIN public.match_vote_pruve AS mv ON c.vote_id = mv.vote_id
-        """
 
-        cur.execute(query)
-        rows = cur.fetchall()
+def stream_comments(ndjson: bool):
+    """Yield every comment as JSON text, a chunk of rows at a time.
 
-        # Construct the Comment objects from the query results
-        comments = []
-        for row in rows:
-            user_details = {
-                "uid": row[2]['uid'],
-                "email": row[2]['email'],
-                "name": row[2]['name'],
-                "picture": row[2]['picture']
-            }
-            comment = Comment(
-                comment_id=row[0],
-                type=row[1],
-                user_details=user_details,
-                time=row[3].strftime("%Y-%m-%d %H:%M:%S"),
-                teams=row[4],
-                comment_text=row[5]
-            )
-            comments.append(comment)
+    Rows come from a named (server-side) cursor, so only one chunk is ever
+    held in memory and the first bytes go out before the query finishes.
+    The pool connection stays checked out until the stream ends or the
+    client goes away, and so does the ``comment_streams`` slot the caller
+    acquired, which is released here.
+    """
+    try:
+        with db_pool.connection() as conn, conn.cursor(name="pruve_comments_stream") as cur, \
+                conn.cursor() as profile_cur:
+            cur.execute(COMMENTS_SELECT + " ORDER BY c.comment_id")
+            separator = b"\n" if ndjson else b","
+            first = True
+            if not ndjson:
+                yield b"["
+            while True:
+                rows = cur.fetchmany(COMMENT_STREAM_CHUNK_SIZE)
+                if not rows:
+                    break
+                profiles = user_profile_cache.get_many(profile_cur, [row[2] for row in rows])
+                comments = [comment_from_row(row, profiles) for row in rows]
+                chunk = separator.join(encode_json(comment) for comment in comments if comment is not None)
+                if not chunk:
+                    continue
+                if ndjson:
+                    yield chunk + b"\n"
+                else:
+                    yield chunk if first else b"," + chunk
+                first = False
+            if not ndjson:
+                yield b"]"
+    finally:
+        comment_streams.release()
 
-        return comments
 
+@app.get("/pruve/comments/")
+def get_comments(format: str = "json"):
+    """Every comment, streamed as a JSON array or, with ``format=ndjson``, one object per line."""
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail='format must be json or ndjson')
+    ndjson = format == "ndjson"
+    if not comment_streams.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail='Too many comment exports in progress',
+                            headers={"Retry-After": "5"})
+    try:
+        stream = stream_comments(ndjson)
+        # Pull the first chunk here so a failing query is still a 500 and not a cut-off body
+        first_chunk = next(stream, b"")
     except (Exception, psycopg2.Error) as error:
         raise HTTPException(status_code=500, detail=str(error))
+    return StreamingResponse(itertools.chain([first_chunk], stream),
+                             media_type="application/x-ndjson" if ndjson else "application/json")
+
+class VotedMatchCache(TTLCache):
+    """Thread-safe LRU cache of ``user_id -> frozenset of voted match_numbers`` with a TTL.
+
+    ``get`` answers from memory and returns None on a miss; ``load`` then
+    reads the user's set with one query on the caller's cursor. ``add``
+    records a new vote in a cached set; a vote recorded while that user's
+    set is being loaded is merged into it, so the load cannot store a set
+    that predates the vote.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 100000):
+        super().__init__(ttl, max_entries)
+        self._loading = {}  # user_id -> [loads in flight, match numbers added meanwhile]
+
+    def load(self, cur, user_id: int) -> frozenset:
+        with self._lock:
+            loading = self._loading.setdefault(user_id, [0, set()])
+            loading[0] += 1
+
+        try:
+            cur.execute("SELECT DISTINCT match_number FROM match_vote_pruve WHERE user_id = %s", (user_id,))
+            voted = {row[0] for row in cur.fetchall()}
+        except BaseException:
+            with self._lock:
+                self._end_load(user_id, loading)
+            raise
+
+        # Merge, store and end the load in one step: an add() always finds
+        # either the load in progress or the stored set
+        with self._lock:
+            voted = frozenset(voted | loading[1])
+            self._store(user_id, voted)
+            self._end_load(user_id, loading)
+        return voted
+
+    def _end_load(self, user_id: int, loading: list):
+        loading[0] -= 1
+        if not loading[0]:
+            del self._loading[user_id]
+
+    def add(self, user_id: int, match_number: int):
+        with self._lock:
+            loading = self._loading.get(user_id)
+            if loading is not None:
+                loading[1].add(match_number)
+            entry = self._entries.get(user_id)
+            if entry is not None and match_number not in entry[1]:
+                self._entries[user_id] = (entry[0], entry[1] | {match_number})
+
+
+voted_matches = VotedMatchCache(ttl=VOTED_MATCHES_CACHE_TTL, max_entries=VOTED_MATCHES_CACHE_MAX_ENTRIES)
+
+MATCH_VOTE_INDEXES_DDL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS match_vote_pruve_user_id_idx ON match_vote_pruve (user_id, match_number);
+"""
+
+
+@app.on_event("startup")
+def ensure_match_vote_indexes():
+    apply_schema(MATCH_VOTE_INDEXES_DDL)
+
 
 class MatchVoteCreate(BaseModel):
     team_id: int
@@ -990,16 +2877,14 @@ class CommentCreate(BaseModel):
     user_id: int
     comment_text: str
 
-#Triggering both matchup vote and conversation
-@app.post("/pruve/{match_number}/match_vote_and_comment")
-async def create_match_vote_and_comment(match_number: int, match_vote: MatchVoteCreate, comment: CommentCreate):
-    try:
-        # Insert the data into the match_vote_pruve table
-        match_vote_insert_query = """
-            INSERT INTO match_vote_pruve (team_id, match_number, user_id)
-            VALUES (%s, %s, %s)
-            RETURNING vote_id
-        """
+def save_match_vote_and_comment(match_number: int, match_vote: MatchVoteCreate, comment: CommentCreate) -> int:
+    # Insert the data into the match_vote_pruve table
+    match_vote_insert_query = """
+        INSERT INTO match_vote_pruve (team_id, match_number, user_id)
+        VALUES (%s, %s, %s)
+        RETURNING vote_id
+    """
+    with async_db_pool.connection() as conn, conn.cursor() as cur:
         cur.execute(match_vote_insert_query, (match_vote.team_id, match_number, match_vote.user_id))
         vote_id = cur.fetchone()[0]
 
@@ -1009,14 +2894,222 @@ async def create_match_vote_and_comment(match_number: int, match_vote: MatchVote
             VALUES (%s, %s, %s, %s)
         """
         cur.execute(comment_insert_query, (comment.user_id, match_number, vote_id, comment.comment_text))
+        # user_id lets every worker's listener update its voted_matches too
+        resources = ["matchschedulev2", "comments:%d" % match_number]
+        stamp = announce_change(cur, resources, {"topic": "match:%d" % match_number, "key": match_vote.team_id,
+                                                 "user_id": match_vote.user_id})
 
         conn.commit()
+    # The match schedule's vote counts move with the votes
+    query_cache.invalidate("matchschedulev2")
+    resource_versions.bump(*resources, at=stamp)
+    voted_matches.add(match_vote.user_id, match_number)
+    return vote_id
+
+#Triggering both matchup vote and conversation
+@app.post("/pruve/{match_number}/match_vote_and_comment", dependencies=[Depends(get_token_claims)])
+async def create_match_vote_and_comment(match_number: int, match_vote: MatchVoteCreate, comment: CommentCreate):
+    try:
+        await run_db(save_match_vote_and_comment, match_number, match_vote, comment)
 
         return {"message": "Data inserted successfully"}
 
     except (Exception, psycopg2.Error) as error:
         raise HTTPException(status_code=500, detail=str(error))
 
+class TallyHub:
+    """Fans tally changes out to live subscribers, one topic per poll or match.
+
+    ``publish`` only accumulates; each topic is flushed at most once per
+    ``interval`` seconds, as one event holding the summed deltas, which is
+    encoded once and queued for every subscriber. A subscriber that falls
+    ``queue_size`` events behind is sent a resync event and dropped, so a
+    slow client can never hold up the others. Everything except ``bind``
+    runs on the event loop.
+    """
+
+    RESYNC = 'event: resync\ndata: {}\n\n'
+
+    def __init__(self, interval: float = 0.25, queue_size: int = 64):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.loop = None
+        self._subscribers = {}  # topic -> set of asyncio.Queue
+        self._pending = {}  # topic -> Counter of key -> votes since the last flush
+        self._last_flush = {}  # topic -> loop time of its last flush
+        self._sequence = Counter()  # topic -> events sent, so clients can spot a gap
+
+        self._published = 0
+        self._flushes = 0
+        self._dropped = 0
+
+    def bind(self, loop):
+        self.loop = loop
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[topic]
+                self._pending.pop(topic, None)
+                self._last_flush.pop(topic, None)
+
+    def publish(self, topic: str, key, count: int = 1):
+        if topic not in self._subscribers:
+            return  # nobody on this worker is listening
+        self._published += 1
+        pending = self._pending.get(topic)
+        if pending is None:
+            pending = self._pending[topic] = Counter()
+            delay = self._last_flush.get(topic, float("-inf")) + self.interval - self.loop.time()
+            self.loop.call_later(max(delay, 0), self._flush, topic)
+        pending[str(key)] += count
+
+    def stats(self) -> dict:
+        return {
+            "topics": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self._published,
+            "flushes": self._flushes,
+            "dropped_subscribers": self._dropped,
+        }
+
+    def _flush(self, topic: str):
+        deltas = self._pending.pop(topic, None)
+        subscribers = self._subscribers.get(topic)
+        if not deltas or not subscribers:
+            return
+        self._last_flush[topic] = self.loop.time()
+        self._sequence[topic] += 1
+        self._flushes += 1
+        message = "event: tally\ndata: %s\n\n" % json.dumps({
+            "topic": topic,
+            "seq": self._sequence[topic],
+            "deltas": deltas,
+            "total_delta": sum(deltas.values()),
+        })
+        for queue in list(subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(topic, queue)
+
+    def _drop(self, topic: str, queue: asyncio.Queue):
+        self.unsubscribe(topic, queue)
+        self._dropped += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(self.RESYNC)
+
+
+tally_hub = TallyHub(interval=TALLY_PUSH_INTERVAL)
+tally_listener_stop = threading.Event()
+
+
+def listen_for_tallies(hub: TallyHub, stop: threading.Event):
+    """LISTEN on TALLY_CHANNEL and hand each committed vote to ``hub``'s loop.
+
+    Changes announced with ``announce_change`` also move this worker's
+    resource_versions and drop its cached queries. Runs on its own thread
+    with its own connection, which is reopened if it drops; votes committed
+    while it is down are not replayed, but the stored change stamps are
+    reloaded once it is listening again.
+    """
+    while not stop.is_set():
+        try:
+            conn = psycopg2.connect(DB_URI)
+        except psycopg2.Error as e:
+            print("Tally listener cannot connect:", str(e))
+            stop.wait(5)
+            continue
+        try:
+            conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute("LISTEN %s" % TALLY_CHANNEL)
+                moved = load_resource_versions(cur)
+            if moved is None:
+                query_cache.invalidate()
+            elif moved:
+                query_cache.invalidate(*moved)
+            while not stop.is_set():
+                if not select.select([conn], [], [], 1.0)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notice = conn.notifies.pop(0)
+                    try:
+                        payload = json.loads(notice.payload)
+                    except ValueError:
+                        continue
+                    if "at" in payload:  # from announce_change, possibly on another worker
+                        query_cache.invalidate(*payload["resources"])
+                        resource_versions.bump(*payload["resources"], at=payload["at"])
+                    if "topic" in payload:
+                        hub.loop.call_soon_threadsafe(hub.publish, payload["topic"], payload["key"])
+                    if "user_id" in payload:  # a match vote, possibly made on another worker
+                        voted_matches.add(payload["user_id"], int(payload["topic"].split(":", 1)[1]))
+        except (psycopg2.Error, OSError) as e:
+            print("Tally listener lost its connection:", str(e))
+            stop.wait(1)
+        finally:
+            conn.close()
+
+
+@app.on_event("startup")
+async def start_tally_listener():
+    tally_hub.bind(asyncio.get_running_loop())
+    tally_listener_stop.clear()
+    threading.Thread(target=listen_for_tallies, args=(tally_hub, tally_listener_stop),
+                     name="pruve-tally-listener", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_tally_listener():
+    tally_listener_stop.set()
+
+
+async def tally_events(topic: str):
+    queue = tally_hub.subscribe(topic)
+    try:
+        yield ": subscribed to %s\n\n" % topic
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"  # stops proxies from closing an idle stream
+                continue
+            yield message
+            if message is TallyHub.RESYNC:
+                return
+    finally:
+        tally_hub.unsubscribe(topic, queue)
+
+
+# Server-sent events: "tally" events carry {"topic", "seq", "deltas", "total_delta"} with
+# deltas keyed by option_id (polls) or team_id (matches); on "resync", refetch and reconnect.
+@app.get("/pruve/polls/{poll_id}/live")
+async def get_poll_tally_stream(poll_id: int):
+    return StreamingResponse(tally_events("poll:%d" % poll_id), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/pruve/matches/{match_number}/live")
+async def get_match_tally_stream(match_number: int):
+    return StreamingResponse(tally_events("match:%d" % match_number), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/pruve/live/stats")
+async def get_live_stats():
+    return tally_hub.stats()
+
+
 class MatchcardModel(BaseModel):
     match_number: int
     team1_id: int
@@ -1031,57 +3124,69 @@ class MatchcardModel(BaseModel):
     description: str
     book_tickets:str
     
-#Get request of matchcards
-@app.get("/pruve/{user_id}/matchcards/", response_model=List[MatchcardModel])
-def get_matches(user_id: int):
-    try:
-        query = """
-        SELECT
-            ms.match_number,
-            ms.team1_id,
-            tl1.name AS team1_name,
-            tl1.icon AS team1_icon,
-            ms.team2_id,
-            tl2.name AS team2_name,
-            tl2.icon AS team2_icon,
-            ms.type,
-            ms.match_time,
-            ms.venue,
-            ms.description,
-            ms.book_tickets
-        FROM
-            public.matchschedule AS ms
-        JOIN
-            public.team_list AS tl1 ON ms.team1_id = tl1.team_id
-        JOIN
-            public.team_list AS tl2 ON ms.team2_id = tl2.team_id
-        WHERE
-            ms.match_number NOT IN (
-                SELECT match_number FROM public.match_vote_pruve WHERE user_id = %s
-            );
-        """
+# Every match card; the schedule rarely changes, so it is cached and shared by all users
+@query_cache.cached("matchschedule", "team_list")
+def get_match_cards_from_db() -> List[dict]:
+    query = """
+    SELECT
+        ms.match_number,
+        ms.team1_id,
+        tl1.name AS team1_name,
+        tl1.icon AS team1_icon,
+        ms.team2_id,
+        tl2.name AS team2_name,
+        tl2.icon AS team2_icon,
+        ms.type,
+        ms.match_time,
+        ms.venue,
+        ms.description,
+        ms.book_tickets
+    FROM
+        public.matchschedule AS ms
+    JOIN
+        public.team_list AS tl1 ON ms.team1_id = tl1.team_id
+    JOIN
+        public.team_list AS tl2 ON ms.team2_id = tl2.team_id
+    ORDER BY
+        ms.match_number
+    """
 
-        cur.execute(query, (user_id,))
+    with db_pool.connection() as conn, conn.cursor() as cur:
+        cur.execute(query)
         results = cur.fetchall()
 
-        matches = []
-        for result in results:
-            match = MatchcardModel(
-                match_number=result[0],
-                team1_id = result[1],
-                team1_name=result[2],
-                team1_icon=result[3],
-                team2_id = result[4],
-                team2_name=result[5],
-                team2_icon=result[6],
-                type=result[7],
-                match_time=result[8],
-                venue=result[9],
-                description=result[10],
-                book_tickets = result[11]
-            )
-            matches.append(match)
+    matches = []
+    for result in results:
+        matches.append({
+            "match_number": result[0],
+            "team1_id": result[1],
+            "team1_name": result[2],
+            "team1_icon": result[3],
+            "team2_id": result[4],
+            "team2_name": result[5],
+            "team2_icon": result[6],
+            "match_time": result[8],
+            "venue": result[9],
+            "type": result[7],
+            "description": result[10],
+            "book_tickets": result[11]
+        })
+    return matches
+
 
-        return matches
+#Get request of matchcards
+@app.get("/pruve/{user_id}/matchcards/", response_model=List[MatchcardModel])
+def get_matches(user_id: int):
+    # The cached cards minus the matches this user has voted on; only a
+    # user's first request (or one after the TTL) touches the database
+    try:
+        cards = get_match_cards_from_db()
+        voted = voted_matches.get(user_id)
+        if voted is None:
+            with db_pool.connection() as conn, conn.cursor() as cur:
+                voted = voted_matches.load(cur, user_id)
+        matches = [card for card in cards if card["match_number"] not in voted]
+
+        return FastJSONResponse(matches)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)